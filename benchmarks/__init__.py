@@ -0,0 +1 @@
+# Offline benchmarks for the upload pipeline; see bench_pipeline.py.
@@ -0,0 +1,324 @@
+import argparse
+import http.server
+import itertools
+import json
+import logging
+import os
+import random
+import shutil
+import sqlite3
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import zlib
+from contextlib import closing
+
+from firstimer.config import load_settings
+from firstimer.metrics import Metrics, percentile
+from firstimer.pipeline import Pipeline
+from firstimer.sessions import find_chrome_binary
+from firstimer.upload_queue import PLATFORMS
+
+from .fake_driver import FakeSessionPool, LatencyProfile
+
+# --- PIPELINE BENCHMARK ---
+#
+# Drops bursts of synthetic screenshots into a temp folder watched by a real
+# Pipeline and measures how long each takes to be posted on every platform.
+# "fake" mode answers the browser side with FakeDriver; "mock" mode drives
+# headless Chrome against the static pages in mock_pages/ served from
+# localhost. Neither touches the network.
+#
+#     python -m benchmarks.bench_pipeline --concurrency 1,2 --sleep 0,2 --caption-length 80,2200
+
+MOCK_PAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_pages")
+MOCK_SITES = {"www.facebook.com": "facebook.html", "www.instagram.com": "instagram.html"}
+
+def write_png(path, width, height, rng):
+    # Random RGB noise, so no two captures are duplicates; written under a
+    # temp name and renamed the way capture tools do it.
+    rows = b"".join(b"\x00" + rng.randbytes(width * 3) for _ in range(height))
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    png = (b"\x89PNG\r\n\x1a\n"
+           + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+           + chunk(b"IDAT", zlib.compress(rows, 1))
+           + chunk(b"IEND", b""))
+    tmp_path = f"{path}.part"
+    with open(tmp_path, "wb") as f:
+        f.write(png)
+    os.replace(tmp_path, path)
+
+class BenchPipeline(Pipeline):
+    def __init__(self, settings, log_callback, watch_directory, metrics, profile=None):
+        super().__init__(settings, log_callback, watch_directory, metrics)
+        self.profile = profile
+
+    def create_session_pool(self):
+        if self.profile is None:
+            return super().create_session_pool()
+        return FakeSessionPool(self.settings.chrome_sessions, self.profile, self.log_callback)
+
+# --- MOCK SITES ---
+
+class MockSiteHandler(http.server.SimpleHTTPRequestHandler):
+    # /www.facebook.com/... and /www.instagram.com/... serve the mock pages,
+    # so the tab URLs still contain the domains the uploader looks for.
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=MOCK_PAGES, **kwargs)
+
+    def translate_path(self, path):
+        site = path.lstrip("/").split("/", 1)[0]
+        return os.path.join(MOCK_PAGES, MOCK_SITES.get(site, "missing.html"))
+
+    def log_message(self, format, *args):
+        pass
+
+def start_mock_server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), MockSiteHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def launch_mock_browsers(count, base_port, workdir, server_port, page_delay_ms, chrome_binary=""):
+    binary = find_chrome_binary(chrome_binary)
+    if not binary:
+        raise SystemExit("Mock mode needs Chrome or Chromium on PATH (or --chrome-binary).")
+    processes = []
+    for index in range(count):
+        port = base_port + index
+        processes.append(subprocess.Popen(
+            [binary, "--headless=new", f"--remote-debugging-port={port}", "--no-first-run",
+             "--no-default-browser-check", f"--user-data-dir={os.path.join(workdir, f'chrome{index}')}",
+             "about:blank"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/json/version", timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise SystemExit(f"Headless Chrome did not open port {port}.")
+                time.sleep(0.2)
+        for site in MOCK_SITES:
+            url = f"http://127.0.0.1:{server_port}/{site}/?delay={page_delay_ms}"
+            request = urllib.request.Request(f"http://127.0.0.1:{port}/json/new?{url}", method="PUT")
+            urllib.request.urlopen(request, timeout=5).close()
+    return processes
+
+# --- SCENARIOS ---
+
+def scenario_config(args, workdir, watch_directory, concurrency, sleep, caption_length):
+    filler = "benchmark caption " * (caption_length // 18 + 1)
+    return {
+        "fb_watch_folder": watch_directory,
+        "ig_watch_folder": watch_directory,
+        "fb_counter_file": os.path.join(workdir, "post_counter.txt"),
+        "log_file": os.path.join(workdir, "program_log.txt"),
+        "wait_seconds": sleep,
+        "delay_after_ig": sleep,
+        "signal_timeout": args.step_timeout,
+        "queue_db_file": os.path.join(workdir, "upload_queue.db"),
+        "queue_max_pending": args.max_pending,
+        "queue_max_attempts": args.max_attempts,
+        "queue_retry_base_delay": 1,
+        "queue_retry_max_delay": 4,
+        "stabilize_debounce_seconds": 0.2,
+        "stabilize_poll_interval": 0.1,
+        "chrome_sessions": concurrency,
+        "batch_max_items": args.batch_size,
+        "batch_window_seconds": args.batch_window,
+        "session_health_interval": 5,
+        "state_db_file": os.path.join(workdir, "state.db"),
+        "preprocess_images": args.preprocess,
+        "preprocess_cache_dir": os.path.join(workdir, "upload_cache"),
+        "phash_enabled": False,
+        # Archived inside the scenario's temp folder, not the real Recycle Bin.
+        "postprocess_policy": "archive",
+        "postprocess_archive_dir": os.path.join(workdir, "posted_archive"),
+        "caption_max_length": caption_length,
+        "metrics_file": os.path.join(workdir, "metrics.jsonl"),
+        "metrics_prometheus_file": "",
+        "fb_caption_template": ("Y{yo} #{counter} " + filler)[:caption_length],
+        "ig_caption_hashtags": "#bench",
+        "chrome_debug_port": args.base_port,
+        "chrome_user_data_dir": os.path.join(workdir, "chrome0"),
+    }
+
+def job_rows(db_file):
+    if not os.path.exists(db_file):
+        return []
+    with closing(sqlite3.connect(db_file)) as db:
+        return db.execute("SELECT path, platform, status, attempts, updated_at FROM jobs").fetchall()
+
+def settled(rows, written):
+    final = {(path, platform) for path, platform, status, _, _ in rows if status in ("done", "failed")}
+    return all((path, platform) in final for path in written for platform in PLATFORMS)
+
+def run_scenario(args, mode, concurrency, sleep, caption_length):
+    workdir = tempfile.mkdtemp(prefix="firstimer-bench-")
+    watch_directory = os.path.join(workdir, "screenshots")
+    os.makedirs(watch_directory)
+    config_file = os.path.join(workdir, "config.json")
+    with open(config_file, "w") as f:
+        json.dump(scenario_config(args, workdir, watch_directory, concurrency, sleep, caption_length), f, indent=4)
+    settings = load_settings(config_file)
+
+    server, browsers, profile = None, [], None
+    if mode == "fake":
+        profile = LatencyProfile(args.step_ms, args.file_ms, args.idle_ms, args.char_us, args.jitter,
+                                 args.failure_rate, args.seed)
+    else:
+        server = start_mock_server()
+        browsers = launch_mock_browsers(concurrency, args.base_port, workdir, server.server_port, args.page_delay_ms,
+                                        args.chrome_binary)
+
+    log_callback = print if args.verbose else (lambda message: None)
+    metrics = Metrics()
+    pipeline = BenchPipeline(settings, log_callback, watch_directory, metrics, profile)
+    rng = random.Random(args.seed)
+    written = {}
+    timed_out = False
+    try:
+        pipeline.start()
+        for burst in range(args.bursts):
+            for index in range(args.burst_size):
+                path = os.path.join(watch_directory, f"capture_{burst:03d}_{index:03d}.png")
+                write_png(path, args.width, args.height, rng)
+                written[path] = time.time()
+            if burst + 1 < args.bursts:
+                time.sleep(args.burst_gap)
+        deadline = time.monotonic() + args.scenario_timeout
+        while not settled(job_rows(settings.queue_db_file), written):
+            if time.monotonic() > deadline:
+                timed_out = True
+                break
+            time.sleep(0.2)
+    finally:
+        pipeline.stop()
+        for browser in browsers:
+            browser.terminate()
+        if server is not None:
+            server.shutdown()
+
+    result = summarize(job_rows(settings.queue_db_file), written, metrics)
+    result.update(mode=mode, concurrency=concurrency, sleep=sleep, caption_length=caption_length,
+                  timed_out=timed_out)
+    if args.keep:
+        result["workdir"] = workdir
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return result
+
+def summarize(rows, written, metrics):
+    by_path = {}
+    for path, platform, status, attempts, updated_at in rows:
+        by_path.setdefault(path, {})[platform] = (status, attempts, updated_at)
+    latencies, finished_at, failed, retries = [], [], 0, 0
+    for path, written_at in written.items():
+        jobs = by_path.get(path, {})
+        retries += sum(attempts for _, attempts, _ in jobs.values())
+        if len(jobs) == len(PLATFORMS) and all(status == "done" for status, _, _ in jobs.values()):
+            done_at = max(updated_at for _, _, updated_at in jobs.values())
+            latencies.append(done_at - written_at)
+            finished_at.append(done_at)
+        elif any(status == "failed" for status, _, _ in jobs.values()):
+            failed += 1
+    latencies.sort()
+    span = (max(finished_at) - min(written.values())) if finished_at else 0
+    steps = metrics.summary()
+    return {
+        "screenshots": len(written),
+        "posted": len(latencies),
+        "failed": failed,
+        "failure_rate": failed / len(written) if written else 0.0,
+        "retries": retries,
+        "latency_p50": percentile(latencies, 0.5),
+        "latency_p95": percentile(latencies, 0.95),
+        "latency_max": latencies[-1] if latencies else 0.0,
+        "jobs_per_minute": len(latencies) * 60 / span if span else 0.0,
+        "upload_p95": {platform: steps.get(f"upload:{platform}", (0, 0.0, 0.0))[2] for platform in PLATFORMS},
+    }
+
+# --- REPORT ---
+
+def print_report(results):
+    header = (f"{'mode':<5} {'conc':>4} {'sleep':>5} {'caption':>7} {'posted':>9} {'fail%':>6} {'retry':>5} "
+              f"{'p50 s':>7} {'p95 s':>7} {'max s':>7} {'jobs/min':>8}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        posted = f"{r['posted']}/{r['screenshots']}"
+        flag = "  (timed out)" if r["timed_out"] else ""
+        print(f"{r['mode']:<5} {r['concurrency']:>4} {r['sleep']:>5g} {r['caption_length']:>7} {posted:>9} "
+              f"{r['failure_rate'] * 100:>6.1f} {r['retries']:>5} {r['latency_p50']:>7.2f} {r['latency_p95']:>7.2f} "
+              f"{r['latency_max']:>7.2f} {r['jobs_per_minute']:>8.1f}{flag}")
+
+def number_list(kind):
+    def parse(text):
+        return [kind(value) for value in text.split(",") if value.strip()]
+    return parse
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_pipeline",
+                                     description="Offline throughput benchmark for the upload pipeline.")
+    parser.add_argument("--mode", choices=("fake", "mock"), default="fake",
+                        help="fake: scripted FakeDriver; mock: headless Chrome against mock_pages/.")
+    parser.add_argument("--concurrency", type=number_list(int), default=[1, 2], help="Browser sessions, e.g. 1,2,4.")
+    parser.add_argument("--sleep", type=number_list(float), default=[0.0], help="wait_seconds/delay_after_ig values.")
+    parser.add_argument("--caption-length", type=number_list(int), default=[200], help="Caption lengths to try.")
+    parser.add_argument("--bursts", type=int, default=3)
+    parser.add_argument("--burst-size", type=int, default=5)
+    parser.add_argument("--burst-gap", type=float, default=2.0, help="Seconds between bursts.")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=360)
+    parser.add_argument("--preprocess", action="store_true", help="Enable Pillow preprocessing.")
+    parser.add_argument("--batch-size", type=int, default=1, help="BATCH_MAX_ITEMS: screenshots per post.")
+    parser.add_argument("--batch-window", type=float, default=0, help="BATCH_WINDOW_SECONDS.")
+    parser.add_argument("--max-pending", type=int, default=25)
+    parser.add_argument("--max-attempts", type=int, default=3)
+    parser.add_argument("--step-timeout", type=float, default=5, help="SIGNAL_TIMEOUT for each page wait.")
+    parser.add_argument("--scenario-timeout", type=float, default=300)
+    parser.add_argument("--step-ms", type=float, default=150, help="Fake driver: time per wait/click step.")
+    parser.add_argument("--file-ms", type=float, default=250, help="Fake driver: time to hand over a file.")
+    parser.add_argument("--idle-ms", type=float, default=300, help="Fake driver: time until the composer settles.")
+    parser.add_argument("--char-us", type=float, default=20, help="Fake driver: caption insert time per character.")
+    parser.add_argument("--jitter", type=float, default=0.3)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fake driver: chance a step times out.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--page-delay-ms", type=int, default=300, help="Mock pages: delay of each page reaction.")
+    parser.add_argument("--base-port", type=int, default=9522, help="Mock mode: first Chrome debug port.")
+    parser.add_argument("--chrome-binary", default="")
+    parser.add_argument("--json", help="Also write the results to this file.")
+    parser.add_argument("--max-failure-rate", type=float, default=None,
+                        help="Exit non-zero if any scenario fails more screenshots than this (0-1), for CI.")
+    parser.add_argument("--keep", action="store_true", help="Keep each scenario's temp folder.")
+    parser.add_argument("--verbose", action="store_true", help="Print the pipeline's log lines.")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Simulated failures would otherwise bury the report in tracebacks.
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.CRITICAL,
+                        format="%(asctime)s - %(levelname)s - %(message)s")
+    results = []
+    for concurrency, sleep, caption_length in itertools.product(args.concurrency, args.sleep, args.caption_length):
+        results.append(run_scenario(args, args.mode, concurrency, sleep, caption_length))
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=4)
+    if args.max_failure_rate is not None and any(
+            r["timed_out"] or r["failure_rate"] > args.max_failure_rate for r in results):
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+import itertools
+import random
+import threading
+import time
+
+from selenium.common.exceptions import NoSuchWindowException
+
+from firstimer.actions import ACTION_SCRIPT
+from firstimer.sessions import SessionPool
+from firstimer.signals import COMPOSER_SETTLE_SCRIPT
+from firstimer.tabs import TabRegistry
+
+# --- FAKE BROWSER ---
+
+class LatencyProfile:
+    # How long the fake page takes for each kind of work. Every delay is
+    # jittered by +/- `jitter` (a fraction), and each in-page step fails
+    # with probability `failure_rate` the way a missing selector would.
+
+    def __init__(self, step_ms=150, file_ms=250, idle_ms=300, char_us=20, jitter=0.3, failure_rate=0.0, seed=None):
+        self.step_ms = step_ms
+        self.file_ms = file_ms
+        self.idle_ms = idle_ms
+        self.char_us = char_us
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def delay(self, ms):
+        with self.lock:
+            factor = 1 + self.random.uniform(-self.jitter, self.jitter)
+        time.sleep(max(0.0, ms * factor) / 1000)
+
+    def fails(self):
+        with self.lock:
+            return self.random.random() < self.failure_rate
+
+class FakeElement:
+    def __init__(self, driver, name):
+        self.driver = driver
+        self.name = name
+
+    def click(self):
+        self.driver.commands += 1
+
+    def send_keys(self, text):
+        self.driver.commands += 1
+        if self.name.endswith("file_input"):
+            self.driver.profile.delay(self.driver.profile.file_ms * len(text.split("\n")))
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.commands += 1
+        if handle not in self.driver.tabs:
+            raise NoSuchWindowException(f"no such window: {handle}")
+        self.driver.current_window_handle = handle
+
+class FakeDriver:
+    # Just enough of a Chrome WebDriver for ScreenshotUploader: tabs, the
+    # in-page action and composer-settle scripts, caption insertion. Scripts are
+    # recognised by identity and answered after the profile's delays.
+
+    handle_ids = itertools.count(1)
+
+    def __init__(self, profile, urls=("https://www.facebook.com/", "https://www.instagram.com/")):
+        self.profile = profile
+        self.commands = 0
+        self.tabs = {}  # handle -> url
+        for url in urls:
+            self._open(url)
+        self.current_window_handle = next(iter(self.tabs))
+        self.switch_to = FakeSwitchTo(self)
+
+    def _open(self, url):
+        handle = f"FAKE{next(self.handle_ids):06d}"
+        self.tabs[handle] = url
+        return handle
+
+    @property
+    def window_handles(self):
+        self.commands += 1
+        return list(self.tabs)
+
+    @property
+    def current_url(self):
+        self.commands += 1
+        return self.tabs[self.current_window_handle]
+
+    def set_script_timeout(self, seconds):
+        self.commands += 1
+
+    def execute_script(self, script, *args):
+        self.commands += 1
+        if script.startswith("window.open"):
+            self._open(args[0])
+            return None
+        if "execCommand" in script:
+            return True
+        return None
+
+    def execute_cdp_cmd(self, command, params):
+        self.commands += 1
+        if command == "Input.insertText":
+            self.profile.delay(len(params["text"]) * self.profile.char_us / 1000)
+        return {}
+
+    def execute_async_script(self, script, *args):
+        self.commands += 1
+        if script is COMPOSER_SETTLE_SCRIPT:
+            self.profile.delay(self.profile.idle_ms)
+            return True
+        if script is ACTION_SCRIPT:
+            return self._run_actions(args[0])
+        raise NotImplementedError("FakeDriver only knows the firstimer page scripts")
+
+    def _run_actions(self, steps):
+        elements, timings = {}, []
+        for step in steps:
+            started = time.monotonic()
+            self.profile.delay(self.profile.step_ms)
+            if self.profile.fails():
+                return {"ok": False, "failed": step["name"], "elements": elements, "timings": timings}
+            elements[step["name"]] = FakeElement(self, step["name"])
+            timings.append([step["name"], 0, round((time.monotonic() - started) * 1000)])
+        return {"ok": True, "elements": elements, "timings": timings}
+
+    def close(self):
+        self.commands += 1
+        self.tabs.pop(self.current_window_handle, None)
+
+    def quit(self):
+        self.tabs.clear()
+
+class FakeTabRegistry(TabRegistry):
+    # Reads the fake driver's tabs instead of the debug port's /json/list.
+
+    def __init__(self, driver):
+        super().__init__(port=0)
+        self.driver = driver
+
+    def list_targets(self, timeout=2):
+        return dict(self.driver.tabs)
+
+class FakeSession:
+    def __init__(self, index, profile):
+        self.index = index
+        self.profile = profile
+        self.driver = None
+        self.tabs = None
+
+    @property
+    def name(self):
+        return f"fake session {self.index}"
+
+    def start(self):
+        self.driver = FakeDriver(self.profile)
+        self.tabs = FakeTabRegistry(self.driver)
+
+    def is_healthy(self):
+        return self.driver is not None
+
+    def recover(self):
+        self.start()
+
+    def close(self):
+        if self.driver is not None:
+            self.driver.quit()
+        self.driver = None
+
+class FakeSessionPool(SessionPool):
+    def __init__(self, size, profile, log_callback):
+        self.log_callback = log_callback
+        self.sessions = [FakeSession(index, profile) for index in range(size)]
+        self.assign_platforms()
@@ -0,0 +1,5 @@
+# Facebook & Instagram auto-uploader for game screenshots.
+#
+# Importing the package is side-effect free: no config is read, no logging is
+# configured and no Chrome is launched. Tkinter, Selenium, watchdog and Pillow
+# are only imported by the code paths that need them.
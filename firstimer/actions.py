@@ -0,0 +1,181 @@
+import functools
+import json
+import logging
+import os
+import re
+
+from selenium.common.exceptions import TimeoutException
+
+from .metrics import Metrics
+
+# --- SELECTOR REGISTRY ---
+
+# Bundled selector sets live in firstimer/selectors/v<N>.json; the highest
+# version wins unless SELECTOR_FILE points somewhere else, so a selector fix
+# is a data change, not a code change.
+SELECTOR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "selectors")
+
+def latest_selector_file(directory=SELECTOR_DIR):
+    versions = []
+    for name in os.listdir(directory):
+        match = re.fullmatch(r"v(\d+)\.json", name)
+        if match:
+            versions.append((int(match.group(1)), name))
+    if not versions:
+        raise FileNotFoundError(f"No selector files (v<N>.json) in {directory}")
+    return os.path.join(directory, max(versions)[1])
+
+class SelectorRegistry:
+    # Named page targets, each with selectors tried in order until one
+    # matches: {"xpath": ...} or {"css": ...}.
+
+    def __init__(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.path = path
+        self.version = data["version"]
+        self.targets = data["targets"]
+        for name, target in self.targets.items():
+            selectors = target.get("selectors")
+            if not selectors or any(len(selector) != 1 or not ({"xpath", "css"} & selector.keys())
+                                    for selector in selectors):
+                raise ValueError(f"Selector target {name!r} in {path} needs a list of {{\"xpath\"|\"css\": ...}}")
+
+    def selectors(self, name):
+        return self.targets[name]["selectors"]
+
+    def label(self, name):
+        return self.targets[name].get("label", name)
+
+@functools.lru_cache(maxsize=8)
+def read_selectors(path, mtime_ns):
+    return SelectorRegistry(path)
+
+LAST_GOOD_SELECTORS = {}  # path -> the last registry that loaded cleanly
+
+def load_selectors(path=""):
+    # Called per post: cached by the file's mtime, so an edited file or a
+    # new bundled vN.json takes effect on the next post. A broken edit keeps
+    # the previous version of that file.
+    path = path or latest_selector_file()
+    try:
+        registry = read_selectors(path, os.stat(path).st_mtime_ns)
+    except (OSError, ValueError, KeyError) as e:
+        if path not in LAST_GOOD_SELECTORS:
+            raise
+        logging.warning(f"Could not reload selectors from {path}, keeping the previous version: {e}")
+        return LAST_GOOD_SELECTORS[path]
+    LAST_GOOD_SELECTORS[path] = registry
+    return registry
+
+# --- IN-PAGE ACTIONS ---
+
+# Runs a whole sequence of waits and clicks in the page as one async script.
+# Each step resolves as soon as a MutationObserver sees its target become
+# ready; clicks wait for the DOM to react (or settleMs) before the next step,
+# and the element just clicked can't satisfy the next step until the page has
+# changed, so two "Next" clicks in a row really are two steps.
+# Resolves with the matched elements by step name, or the step that timed out.
+ACTION_SCRIPT = """
+const steps = arguments[0], stepTimeoutMs = arguments[1], settleMs = arguments[2];
+const done = arguments[arguments.length - 1];
+const visible = (el) => el.isConnected && el.getClientRects().length > 0 && getComputedStyle(el).visibility !== "hidden";
+const clickable = (el) => visible(el) && !el.disabled && el.getAttribute("aria-disabled") !== "true";
+const ready = {present: (el) => el.isConnected, visible: visible, clickable: clickable, click: clickable};
+const watched = {subtree: true, childList: true, attributes: true, characterData: true};
+let changes = 0, lastClicked = null, clickedAt = 0;
+const counter = new MutationObserver(() => { changes++; });
+counter.observe(document, watched);
+const fresh = (el) => el !== lastClicked || changes > clickedAt;
+const query = (selector) => {
+    try {
+        if (selector.css) return Array.from(document.querySelectorAll(selector.css));
+        const found = document.evaluate(selector.xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        const nodes = [];
+        for (let i = 0; i < found.snapshotLength; i++) nodes.push(found.snapshotItem(i));
+        return nodes;
+    } catch (e) {
+        return [];
+    }
+};
+const resolve = (step) => {
+    for (let i = 0; i < step.selectors.length; i++) {
+        const el = query(step.selectors[i]).find((el) => fresh(el) && ready[step.action](el));
+        if (el) return [el, i];
+    }
+    return null;
+};
+const waitFor = (step) => new Promise((accept, reject) => {
+    const hit = resolve(step);
+    if (hit) return accept(hit);
+    const observer = new MutationObserver(() => {
+        const hit = resolve(step);
+        if (!hit) return;
+        observer.disconnect();
+        clearTimeout(timer);
+        accept(hit);
+    });
+    observer.observe(document, watched);
+    const timer = setTimeout(() => { observer.disconnect(); reject(); }, stepTimeoutMs);
+});
+const reaction = () => new Promise((accept) => {
+    const observer = new MutationObserver(() => { observer.disconnect(); clearTimeout(timer); accept(); });
+    observer.observe(document, watched);
+    const timer = setTimeout(() => { observer.disconnect(); accept(); }, settleMs);
+});
+(async () => {
+    const elements = {}, timings = [];
+    for (const step of steps) {
+        const started = performance.now();
+        let hit;
+        try {
+            hit = await waitFor(step);
+        } catch (e) {
+            counter.disconnect();
+            return done({ok: false, failed: step.name, elements: elements, timings: timings});
+        }
+        if (step.action === "click") {
+            const reacted = reaction();
+            lastClicked = hit[0];
+            clickedAt = changes;
+            hit[0].click();
+            await reacted;
+        }
+        elements[step.name] = hit[0];
+        timings.push([step.name, hit[1], Math.round(performance.now() - started)]);
+    }
+    counter.disconnect();
+    done({ok: true, elements: elements, timings: timings});
+})();
+"""
+
+class PageActions:
+    # Drives ACTION_SCRIPT: one WebDriver round trip per sequence instead of
+    # a polled wait plus a click per step. Steps are (action, target) with
+    # action one of "click", "clickable", "visible" or "present".
+
+    def __init__(self, driver, registry, log_callback, timeout=30, settle_ms=250, metrics=None):
+        self.driver = driver
+        self.metrics = metrics or Metrics()
+        self.registry = registry
+        self.log_callback = log_callback
+        self.timeout = timeout
+        self.settle_ms = settle_ms
+
+    def run(self, *steps):
+        payload = [{"name": name, "action": action, "selectors": self.registry.selectors(name)}
+                   for action, name in steps]
+        self.driver.set_script_timeout(self.timeout * len(steps) + 5)
+        result = self.driver.execute_async_script(ACTION_SCRIPT, payload, int(self.timeout * 1000), self.settle_ms)
+        for (action, name), (_, selector_index, elapsed_ms) in zip(steps, result["timings"]):
+            self.metrics.record(f"{action}:{name}", elapsed_ms / 1000, selector=selector_index)
+            if selector_index:
+                logging.warning(f"{name} only matched fallback selector #{selector_index} "
+                                f"(selectors v{self.registry.version})")
+            verb = "Clicked" if action == "click" else "Found"
+            self.log_callback(f"✅ {verb} {self.registry.label(name)} ({elapsed_ms} ms).")
+        if not result["ok"]:
+            self.metrics.record(f"{steps[len(result['timings'])][0]}:{result['failed']}", self.timeout, "timeout")
+            raise TimeoutException(f"{self.registry.label(result['failed'])} ({result['failed']}) not ready "
+                                   f"within {self.timeout}s (selectors v{self.registry.version})")
+        return result["elements"]
@@ -0,0 +1,59 @@
+import functools
+import string
+
+# --- CAPTION GENERATION ---
+
+OVERFLOW_POLICIES = ("cap_yo", "truncate")
+ELLIPSIS = "…"
+
+def generate_caption(template, counter):
+    yo_text = "o" * counter
+    return template.format(yo=yo_text, counter=counter)
+
+class CaptionEngine:
+    # Renders "{yo}"/"{counter}" templates without ever exceeding max_length.
+    # The template is parsed once; with "cap_yo" the run of o's is shortened
+    # to fit, with "truncate" the finished caption is cut and ellipsized.
+    # The suffix (e.g. the IG hashtags) is plain text, never a template.
+
+    FIELDS = ("yo", "counter")
+
+    def __init__(self, template, max_length=2200, overflow="cap_yo", suffix=""):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown caption overflow policy {overflow!r}, expected one of {OVERFLOW_POLICIES}")
+        if max_length < 1:
+            raise ValueError(f"Caption max length must be at least 1, got {max_length}")
+        self.max_length = max_length
+        self.overflow = overflow
+        self.parts = []  # literal strings and field names, in order
+        for literal, field, _, _ in string.Formatter().parse(template):
+            if literal:
+                self.parts.append(("literal", literal))
+            if field is not None:
+                if field not in self.FIELDS:
+                    raise ValueError(f"Unknown caption field {{{field}}} in {template!r}")
+                self.parts.append(("field", field))
+        if suffix:
+            self.parts.append(("literal", suffix))
+        self.yo_fields = sum(1 for kind, value in self.parts if kind == "field" and value == "yo")
+        self.render = functools.lru_cache(maxsize=256)(self._render)
+
+    def _join(self, counter, yo_length):
+        values = {"yo": "o" * yo_length, "counter": str(counter)}
+        return "".join(value if kind == "literal" else values[value] for kind, value in self.parts)
+
+    def _render(self, counter):
+        yo_length = counter
+        if self.overflow == "cap_yo" and self.yo_fields:
+            fixed_length = len(self._join(counter, 0))
+            room = (self.max_length - fixed_length) // self.yo_fields
+            yo_length = max(0, min(counter, room))
+        caption = self._join(counter, yo_length).strip()
+        if len(caption) > self.max_length:
+            caption = caption[:self.max_length - len(ELLIPSIS)].rstrip() + ELLIPSIS
+        return caption
+
+@functools.lru_cache(maxsize=None)
+def caption_engine(template, max_length, overflow, suffix=""):
+    # Shared across uploads so the parse and the render cache are reused.
+    return CaptionEngine(template, max_length, overflow, suffix)
@@ -0,0 +1,161 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from .upload_queue import file_sha256
+from .watcher import is_screenshot
+
+# --- STARTUP CATCH-UP ---
+
+class ScanManifest:
+    # What the catch-up scan already knows about each file in the watched
+    # folder: (size, mtime_ns) -> content hash, plus the last outcome. A
+    # file whose size and mtime haven't changed is never hashed again.
+
+    def __init__(self, db_file):
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(db_file, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS scan_manifest (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                outcome TEXT
+            )""")
+
+    def load(self):
+        # {path: (size, mtime_ns, content_hash, outcome)}
+        with self.lock:
+            rows = self.db.execute("SELECT path, size, mtime_ns, content_hash, outcome FROM scan_manifest").fetchall()
+        return {row[0]: row[1:] for row in rows}
+
+    def record(self, path, size, mtime_ns, content_hash, outcome):
+        with self.lock:
+            self.db.execute("""
+                INSERT INTO scan_manifest (path, size, mtime_ns, content_hash, outcome) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET size = excluded.size, mtime_ns = excluded.mtime_ns,
+                    content_hash = excluded.content_hash, outcome = excluded.outcome""",
+                (path, size, mtime_ns, content_hash, outcome))
+
+    def forget(self, paths):
+        with self.lock:
+            self.db.execute("BEGIN")
+            self.db.executemany("DELETE FROM scan_manifest WHERE path = ?", ((path,) for path in paths))
+            self.db.execute("COMMIT")
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+class CatchUpScanner(threading.Thread):
+    # Queues screenshots that landed while the app wasn't running, or that
+    # never got posted, oldest first. Runs beside the watcher: the scan is
+    # one os.scandir pass (stat only, hashing only new or changed files) and
+    # one batched query for the files already known; a file that is
+    # unchanged and already settled costs no further database work. The
+    # backlog is fed through the watcher's own enqueue at `rate` files per
+    # minute, only while the queue has `headroom` slots to spare for live
+    # captures.
+
+    def __init__(self, directory, handler, upload_queue, manifest, stop_event, log_callback, rate=20, min_age=10,
+                 headroom=5):
+        super().__init__(daemon=True)
+        self.directory = os.path.normpath(directory)
+        self.handler = handler
+        self.upload_queue = upload_queue
+        self.manifest = manifest
+        self.stop_event = stop_event
+        self.log_callback = log_callback
+        self.interval = 60 / rate if rate > 0 else 0
+        self.min_age = min_age
+        self.headroom = headroom
+
+    def scan(self):
+        # Returns the files that may still need posting as [(mtime_ns, path,
+        # size)], oldest first, and the manifest as it was before the scan.
+        # The manifest is shared by every watched folder; only ours matters here.
+        known = {path: row for path, row in self.manifest.load().items()
+                 if os.path.dirname(path) == self.directory}
+        cutoff_ns = time.time_ns() - int(self.min_age * 1e9)
+        candidates = []
+        seen = set()
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.is_file() or not is_screenshot(entry.name):
+                    continue
+                path = os.path.join(self.directory, entry.name)
+                seen.add(path)
+                st = entry.stat()
+                if st.st_mtime_ns > cutoff_ns:
+                    continue  # still fresh: the watcher has it
+                candidates.append((st.st_mtime_ns, path, st.st_size))
+        gone = [path for path in known if path not in seen]
+        if gone:
+            self.manifest.forget(gone)
+        candidates.sort()
+        return candidates, known
+
+    def wait_for_room(self):
+        limit = max(1, self.upload_queue.max_pending - self.headroom)
+        while self.upload_queue.active_count() >= limit:
+            if self.stop_event.wait(1):
+                return False
+        return True
+
+    def run(self):
+        try:
+            started = time.monotonic()
+            candidates, known = self.scan()
+            logging.info(f"Catch-up scan of {self.directory}: {len(candidates)} candidate(s) "
+                         f"in {time.monotonic() - started:.2f}s")
+            platforms = self.handler.platforms
+            unchanged = {path: known[path][2] for mtime_ns, path, size in candidates
+                         if path in known and known[path][:2] == (size, mtime_ns)}
+            settled = self.upload_queue.settled_hashes(set(unchanged.values()), platforms)
+            queued = 0
+            for mtime_ns, path, size in candidates:
+                if self.stop_event.is_set():
+                    break
+                previous = known.get(path)
+                if path in unchanged:
+                    content_hash = unchanged[path]
+                    is_settled = content_hash in settled
+                else:
+                    try:
+                        content_hash = file_sha256(path)
+                    except OSError:
+                        continue  # deleted or still locked; the watcher will see it if it changes
+                    is_settled = self.upload_queue.is_settled(content_hash, platforms)
+                if is_settled:
+                    outcome = "duplicate"
+                else:
+                    if not self.wait_for_room():
+                        break
+                    outcome = self.handler.enqueue(path, content_hash)
+                if previous != (size, mtime_ns, content_hash, outcome):
+                    self.manifest.record(path, size, mtime_ns, content_hash, outcome)
+                if outcome == "queued":
+                    queued += 1
+                    if self.stop_event.wait(self.interval):
+                        break
+            if queued:
+                self.log_callback(f"🧹 Catch-up finished: queued {queued} screenshot(s) from before startup.")
+        except Exception as e:
+            logging.error(f"Catch-up scan failed: {e}")
+            self.log_callback(f"⚠️ Catch-up scan failed: {e}")
+
+def create_catchup_scanners(settings, handlers, upload_queue, stop_event, log_callback):
+    # One scanner per watched folder ({directory: handler}), sharing a manifest.
+    if not settings.catchup_enabled:
+        return [], None
+    manifest = ScanManifest(settings.state_db_file)
+    scanners = [CatchUpScanner(directory, handler, upload_queue, manifest, stop_event, log_callback,
+                               settings.catchup_rate_per_minute, settings.catchup_min_age_seconds,
+                               settings.catchup_queue_headroom)
+                for directory, handler in handlers.items()]
+    return scanners, manifest
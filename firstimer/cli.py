@@ -0,0 +1,89 @@
+import argparse
+import json
+import signal
+import subprocess
+import sys
+import threading
+
+from .config import CONFIG_FILE, ConfigError
+
+# Modules that must not be pulled in just by importing the package.
+HEAVY_MODULES = ("tkinter", "selenium", "watchdog", "PIL", "send2trash")
+IMPORT_TIME_BUDGET_MS = 150
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import firstimer.cli, firstimer.pipeline
+elapsed_ms = (time.perf_counter() - started) * 1000
+heavy = sorted(name for name in {heavy!r} if name in sys.modules)
+print(json.dumps({{"ms": elapsed_ms, "heavy": heavy}}))
+"""
+
+def print_event(message):
+    print(message, flush=True)
+
+def run_watch(args):
+    from .config import load_settings
+    from .logs import setup_logging
+    from .pipeline import Pipeline
+
+    # Service logs are often redirected to a file with a non-UTF-8 locale.
+    sys.stdout.reconfigure(errors="replace")
+    settings = load_settings(args.config)
+    log_listener = setup_logging(settings.log_file, console=args.verbose)
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    pipeline = Pipeline(settings, print_event, args.directory)
+    try:
+        pipeline.start()
+        while not stop.wait(1):
+            pass
+    finally:
+        print_event("⛔ Stopping...")
+        pipeline.stop()
+        log_listener.stop()
+    return 0
+
+def run_gui(args):
+    from .gui import main as gui_main
+    return gui_main(args.config)
+
+def run_check_imports(args):
+    # Measured in a fresh interpreter so nothing is already cached.
+    probe = IMPORT_PROBE.format(heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout
+    result = json.loads(output)
+    print(f"Import time: {result['ms']:.1f} ms (budget {args.budget_ms} ms)")
+    if result["heavy"]:
+        print(f"Heavy modules imported eagerly: {', '.join(result['heavy'])}")
+    return 0 if result["ms"] <= args.budget_ms and not result["heavy"] else 1
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="firstimer", description="Facebook & Instagram screenshot auto-uploader.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    watch = subparsers.add_parser("watch", help="Run the watcher and upload pipeline headless.")
+    watch.add_argument("--config", default=CONFIG_FILE, help="Path to config.json.")
+    watch.add_argument("--directory", help="Folder to watch instead of the configured one.")
+    watch.add_argument("--verbose", action="store_true", help="Also echo the log file to stderr.")
+    watch.set_defaults(func=run_watch)
+
+    gui = subparsers.add_parser("gui", help="Open the Tk window.")
+    gui.add_argument("--config", default=CONFIG_FILE, help="Path to config.json.")
+    gui.set_defaults(func=run_gui)
+
+    check = subparsers.add_parser("check-imports", help="Fail if importing the package is slow or loads heavy deps.")
+    check.add_argument("--budget-ms", type=float, default=IMPORT_TIME_BUDGET_MS)
+    check.set_defaults(func=run_check_imports)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except ConfigError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
@@ -0,0 +1,401 @@
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, fields
+
+# --- CONFIGURATION ---
+
+CONFIG_FILE = "config.json"
+DEFAULT_CONFIG = {
+    "fb_watch_folder": "C:/Users/SOmeone/Videos/NVIDIA/League of Legends",
+    "ig_watch_folder": "C:/Users/SOmeone/Videos/NVIDIA/League of Legends",
+    "ig_counter": 0,
+    "fb_counter_file": "post_counter.txt",
+    "wait_seconds": 0,
+    "remember_settings": True,
+    "fb_caption_template": "Y{yo}, another fake win ra9m: {counter}",
+    "ig_caption_hashtags": "#Gaming #VideoGames #GGWP #GamingMoments #GoodVibes",
+    "chrome_debug_port": 9222,
+    "chrome_user_data_dir": "",
+    "chrome_profile_directory": "Default",
+    "log_file": "program_log.txt",
+    "delay_after_ig": 0,
+    "signal_timeout": 30,
+    "page_quiet_ms": 750,
+    "settle_timeout": 5,
+    "queue_db_file": "upload_queue.db",
+    "queue_max_pending": 25,
+    "queue_max_attempts": 5,
+    "queue_retry_base_delay": 30,
+    "queue_retry_max_delay": 900,
+    "queue_max_replays": 10,
+    "stabilize_debounce_seconds": 1.5,
+    "stabilize_poll_interval": 0.5,
+    "stabilize_timeout": 120,
+    "chrome_binary": "",
+    "chrome_sessions": 2,
+    "chrome_start_timeout": 20,
+    "session_health_interval": 30,
+    "state_db_file": "state.db",
+    "preprocess_images": True,
+    "preprocess_format": "JPEG",
+    "preprocess_quality": 85,
+    "preprocess_workers": 2,
+    "preprocess_cache_dir": "upload_cache",
+    "preprocess_cache_days": 7,
+    "phash_enabled": True,
+    "phash_max_distance": 6,
+    "phash_window_seconds": 600,
+    "phash_retention_days": 30,
+    "log_max_lines": 2000,
+    "log_flush_ms": 100,
+    "caption_max_length": 2200,
+    "caption_overflow": "cap_yo",
+    "selector_file": "",
+    "action_settle_ms": 250,
+    "metrics_file": "metrics.jsonl",
+    "metrics_max_bytes": 5242880,
+    "metrics_backups": 3,
+    "metrics_prometheus_file": "firstimer.prom",
+    "metrics_export_interval": 15,
+    "metrics_window": 500,
+    "catchup_enabled": True,
+    "catchup_rate_per_minute": 20,
+    "catchup_min_age_seconds": 10,
+    "catchup_queue_headroom": 5,
+    "batch_max_items": 1,
+    "batch_window_seconds": 0,
+    "postprocess_policy": "trash",
+    "postprocess_archive_dir": "posted_archive",
+    "postprocess_workers": 1,
+    "postprocess_zip_max_mb": 512,
+    "config_reload_interval": 2
+}
+
+# Keys older config files used. Every other UPPER_CASE key is read as its
+# lower-case name; a lower-case key wins over its legacy spelling.
+LEGACY_KEYS = {
+    "SCREENSHOT_DIRECTORY": ("fb_watch_folder", "ig_watch_folder"),
+    "USER_DATA_DIR": ("chrome_user_data_dir",),
+    "PROFILE_DIRECTORY": ("chrome_profile_directory",),
+    "COUNTER_FILE": ("fb_counter_file",),
+    "DELAY_FB_TO_IG": ("wait_seconds",),
+}
+# Understood but unused: the old script's per-platform prompts.
+IGNORED_KEYS = {"prompt_fb", "prompt_ig", "ig_counter_key", "IG_COUNTER_KEY"}
+# Blank means "use the default" for these. A blank chrome_user_data_dir is
+# kept: Chrome is then started without --user-data-dir.
+DEFAULT_IF_BLANK = {"chrome_profile_directory"}
+# (lowest, highest) for every numeric setting; None leaves that end open.
+# Intervals have a floor above 0 because each one drives a wait() loop.
+BOUNDS = {
+    "ig_counter": (0, None),
+    "wait_seconds": (0, 3600),
+    "chrome_debug_port": (1024, 65535),
+    "delay_after_ig": (0, 3600),
+    "signal_timeout": (1, 600),
+    "page_quiet_ms": (0, 60000),
+    "settle_timeout": (1, 120),
+    "queue_max_pending": (1, 10000),
+    "queue_max_attempts": (1, 100),
+    "queue_retry_base_delay": (1, 86400),
+    "queue_retry_max_delay": (1, 86400),
+    "queue_max_replays": (0, 1000),
+    "stabilize_debounce_seconds": (0.05, 60),
+    "stabilize_poll_interval": (0.05, 10),
+    "stabilize_timeout": (1, 3600),
+    "chrome_sessions": (1, 8),
+    "chrome_start_timeout": (1, 300),
+    "session_health_interval": (1, 3600),
+    "preprocess_quality": (1, 100),
+    "preprocess_workers": (1, 32),
+    "preprocess_cache_days": (0, 365),
+    "phash_max_distance": (0, 64),
+    "phash_window_seconds": (0, None),
+    "phash_retention_days": (0, None),
+    "log_max_lines": (100, 1000000),
+    "log_flush_ms": (10, 10000),
+    "caption_max_length": (1, 63206),
+    "action_settle_ms": (0, 10000),
+    "metrics_max_bytes": (1024, None),
+    "metrics_backups": (0, 100),
+    "metrics_export_interval": (1, 3600),
+    "metrics_window": (1, 100000),
+    "catchup_rate_per_minute": (0, 600),
+    "catchup_min_age_seconds": (0, None),
+    "catchup_queue_headroom": (0, None),
+    "batch_max_items": (1, 10),
+    "batch_window_seconds": (0, 60),
+    "postprocess_workers": (1, 16),
+    "postprocess_zip_max_mb": (1, None),
+    "config_reload_interval": (0.5, 3600),
+}
+# 0 turns these off instead of being out of range.
+ZERO_MEANS_OFF = {"catchup_rate_per_minute", "config_reload_interval"}
+# Read per post (by ScreenshotUploader), so a reload applies to the next job.
+# Everything else is wired up in Pipeline.start() and needs a restart.
+HOT_RELOAD_FIELDS = frozenset({
+    "wait_seconds", "delay_after_ig", "signal_timeout", "page_quiet_ms", "settle_timeout", "fb_caption_template",
+    "ig_caption_hashtags", "caption_max_length", "caption_overflow", "selector_file", "action_settle_ms",
+})
+
+TYPE_NAMES = {bool: "true or false", int: "a whole number", float: "a number", str: "a string"}
+
+class ConfigError(ValueError):
+    pass
+
+@dataclass(frozen=True)
+class Settings:
+    # One validated, immutable snapshot of config.json. Nothing holding one
+    # ever sees it change; a reload builds a new one (see ConfigStore).
+    config_file: str
+    fb_watch_folder: str
+    ig_watch_folder: str
+    ig_counter: int
+    fb_counter_file: str
+    wait_seconds: float
+    remember_settings: bool
+    fb_caption_template: str
+    ig_caption_hashtags: str
+    chrome_debug_port: int
+    chrome_user_data_dir: str
+    chrome_profile_directory: str
+    log_file: str
+    delay_after_ig: float
+    signal_timeout: float
+    page_quiet_ms: int
+    settle_timeout: float
+    queue_db_file: str
+    queue_max_pending: int
+    queue_max_attempts: int
+    queue_retry_base_delay: float
+    queue_retry_max_delay: float
+    queue_max_replays: int
+    stabilize_debounce_seconds: float
+    stabilize_poll_interval: float
+    stabilize_timeout: float
+    chrome_binary: str
+    chrome_sessions: int
+    chrome_start_timeout: float
+    session_health_interval: float
+    state_db_file: str
+    preprocess_images: bool
+    preprocess_format: str
+    preprocess_quality: int
+    preprocess_workers: int
+    preprocess_cache_dir: str
+    preprocess_cache_days: float
+    phash_enabled: bool
+    phash_max_distance: int
+    phash_window_seconds: float
+    phash_retention_days: float
+    log_max_lines: int
+    log_flush_ms: int
+    caption_max_length: int
+    caption_overflow: str
+    selector_file: str
+    action_settle_ms: int
+    metrics_file: str
+    metrics_max_bytes: int
+    metrics_backups: int
+    metrics_prometheus_file: str
+    metrics_export_interval: float
+    metrics_window: int
+    catchup_enabled: bool
+    catchup_rate_per_minute: float
+    catchup_min_age_seconds: float
+    catchup_queue_headroom: int
+    batch_max_items: int
+    batch_window_seconds: float
+    postprocess_policy: str
+    postprocess_archive_dir: str
+    postprocess_workers: int
+    postprocess_zip_max_mb: float
+    config_reload_interval: float
+
+    def watch_roots(self):
+        # {folder: platforms}. Both platforms share one root when their
+        # folders are the same.
+        roots = {}
+        for platform, folder in (("facebook", self.fb_watch_folder), ("instagram", self.ig_watch_folder)):
+            key = os.path.normcase(os.path.abspath(folder))
+            roots.setdefault(key, (folder, []))[1].append(platform)
+        return {folder: tuple(platforms) for folder, platforms in roots.values()}
+
+# --- LOAD CONFIG ---
+def read_config(config_file=CONFIG_FILE):
+    with open(config_file, "r", encoding="utf-8") as f:
+        try:
+            config = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ConfigError(f"{config_file} is not valid JSON: {e}") from None
+    if not isinstance(config, dict):
+        raise ConfigError(f"{config_file} must hold a JSON object")
+    return config
+
+def load_config(config_file=CONFIG_FILE):
+    try:
+        return read_config(config_file)
+    except FileNotFoundError:
+        save_config(DEFAULT_CONFIG, config_file)
+        return DEFAULT_CONFIG.copy()
+
+def save_config(cfg, config_file=CONFIG_FILE):
+    # Written next to the file and swapped in, so a reload never reads half a file.
+    tmp_file = f"{config_file}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(cfg, f, indent=4)
+    os.replace(tmp_file, config_file)
+
+def update_config(changes, config_file=CONFIG_FILE):
+    config = load_config(config_file)
+    config.update(changes)
+    save_config(config, config_file)
+
+def check_value(name, expected, value):
+    if expected is bool:
+        if isinstance(value, bool):
+            return value
+    elif expected in (int, float):
+        if isinstance(value, (int, float)) and not isinstance(value, bool) \
+                and (expected is float or float(value).is_integer()):
+            value = expected(value)
+            lowest, highest = BOUNDS[name]
+            if value == 0 and name in ZERO_MEANS_OFF:
+                return value
+            if value < lowest or (highest is not None and value > highest):
+                allowed = f"at least {lowest}" if highest is None else f"between {lowest} and {highest}"
+                raise ConfigError(f"{name} must be {allowed}, got {value}")
+            return value
+    elif isinstance(value, expected):
+        return value
+    raise ConfigError(f"{name} must be {TYPE_NAMES[expected]}, got {value!r}")
+
+def parse_settings(config, config_file=CONFIG_FILE):
+    # Turns a parsed config.json into a Settings snapshot. Every problem is
+    # reported at once; unknown keys only warn, so a typo is visible
+    # instead of silently ignored.
+    from .captions import OVERFLOW_POLICIES, CaptionEngine
+    from .postprocess import POSTPROCESS_POLICIES
+
+    values = {key: value for key, value in config.items() if key in DEFAULT_CONFIG}
+    for key, value in config.items():
+        if key in DEFAULT_CONFIG or key in IGNORED_KEYS:
+            continue
+        targets = LEGACY_KEYS.get(key, (key.lower(),))
+        if key.isupper() and all(target in DEFAULT_CONFIG for target in targets):
+            for target in targets:
+                values.setdefault(target, value)
+        else:
+            logging.warning(f"Unknown setting {key!r} in {config_file}, ignoring it")
+
+    errors = []
+    resolved = {"config_file": config_file}
+    for field in fields(Settings):
+        if field.name == "config_file":
+            continue
+        value = values.get(field.name, DEFAULT_CONFIG[field.name])
+        if field.name in DEFAULT_IF_BLANK and value == "":
+            value = DEFAULT_CONFIG[field.name]
+        try:
+            resolved[field.name] = check_value(field.name, field.type, value)
+        except ConfigError as e:
+            errors.append(str(e))
+    choices = {"caption_overflow": OVERFLOW_POLICIES, "postprocess_policy": POSTPROCESS_POLICIES,
+               "preprocess_format": ("JPEG", "WEBP")}
+    if isinstance(resolved.get("preprocess_format"), str):
+        resolved["preprocess_format"] = resolved["preprocess_format"].upper()
+    for name, allowed in choices.items():
+        if name in resolved and resolved[name] not in allowed:
+            errors.append(f"{name} must be one of {allowed}, got {resolved[name]!r}")
+    # Parsed now so a bad template is rejected here, not at the next post.
+    if all(name in resolved for name in ("fb_caption_template", "caption_max_length")) \
+            and resolved.get("caption_overflow") in OVERFLOW_POLICIES:
+        try:
+            CaptionEngine(resolved["fb_caption_template"], resolved["caption_max_length"],
+                          resolved["caption_overflow"])
+        except ValueError as e:
+            errors.append(f"fb_caption_template: {e}")
+    if resolved.get("queue_retry_max_delay", 0) < resolved.get("queue_retry_base_delay", 0):
+        errors.append("queue_retry_max_delay must not be below queue_retry_base_delay")
+    if resolved.get("chrome_debug_port", 0) + resolved.get("chrome_sessions", 1) - 1 > 65535:
+        errors.append("chrome_debug_port leaves no room for one port per Chrome session")
+    # One watch folder set means both platforms watch it.
+    if resolved.get("fb_watch_folder") == "":
+        resolved["fb_watch_folder"] = resolved.get("ig_watch_folder", "")
+    if resolved.get("ig_watch_folder") == "":
+        resolved["ig_watch_folder"] = resolved.get("fb_watch_folder", "")
+    if resolved.get("fb_watch_folder") == "":
+        errors.append("fb_watch_folder or ig_watch_folder must be set")
+    if errors:
+        raise ConfigError(f"Invalid settings in {config_file}: " + "; ".join(errors))
+    return Settings(**resolved)
+
+def load_settings(config_file=CONFIG_FILE):
+    # Reads config.json once; everything downstream gets the snapshot.
+    return parse_settings(load_config(config_file), config_file)
+
+# --- HOT RELOAD ---
+
+def file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+class ConfigStore:
+    # Holds the current Settings. Readers take current() once per job and
+    # keep that snapshot; a reload swaps in a complete new one, so nobody
+    # ever sees half-old, half-new settings. The file is only parsed when
+    # its mtime or size changes.
+
+    def __init__(self, config_file=CONFIG_FILE):
+        self.config_file = config_file
+        self.lock = threading.Lock()
+        # Stamped before reading: an edit landing in between is picked up by
+        # the first reload instead of being marked as already seen.
+        self.stamp = file_stamp(config_file)
+        self.settings = load_settings(config_file)
+
+    def current(self):
+        return self.settings
+
+    def reload_if_changed(self):
+        # Returns the names of the settings that changed. Raises ConfigError
+        # (or OSError) and keeps the current snapshot if the file is invalid.
+        with self.lock:
+            stamp = file_stamp(self.config_file)
+            if stamp is None or stamp == self.stamp:
+                return []
+            self.stamp = stamp
+            settings = parse_settings(read_config(self.config_file), self.config_file)
+            changed = [field.name for field in fields(Settings)
+                       if getattr(settings, field.name) != getattr(self.settings, field.name)]
+            self.settings = settings
+            return changed
+
+class ConfigReloader(threading.Thread):
+    def __init__(self, store, stop_event, log_callback, interval=2):
+        super().__init__(daemon=True)
+        self.store = store
+        self.stop_event = stop_event
+        self.log_callback = log_callback
+        self.interval = interval
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                changed = self.store.reload_if_changed()
+            except (ConfigError, OSError) as e:
+                logging.warning(f"Config reload failed, keeping the previous settings: {e}")
+                self.log_callback(f"⚠️ Config not reloaded, keeping the previous settings: {e}")
+                continue
+            if not changed:
+                continue
+            logging.info(f"Reloaded {self.store.config_file}: {', '.join(changed)}")
+            self.log_callback(f"🔧 Reloaded settings: {', '.join(changed)}")
+            pending = [name for name in changed if name not in HOT_RELOAD_FIELDS]
+            if pending:
+                self.log_callback(f"⚠️ Takes effect after a restart: {', '.join(pending)}")
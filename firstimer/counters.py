@@ -0,0 +1,120 @@
+import sqlite3
+import threading
+
+# --- COUNTER UTILS ---
+
+POST_COUNTERS = {"facebook": "fb_post", "instagram": "ig_post"}
+
+def jobs_key(jobs):
+    # Reservations made by the pipeline are keyed by the ids of the jobs in
+    # the post, so a restart can tell which ones a queued job still needs.
+    return ",".join(str(job.id) for job in jobs)
+
+class CounterStore:
+    # Post counters kept in memory behind a lock and persisted to SQLite in
+    # WAL mode. Every reservation is its own committed transaction, so a
+    # crash never hands out the same number twice; synchronous=NORMAL leaves
+    # the fsyncs to WAL checkpoints, which batches them.
+    #
+    # Posts take their number with reserve(): the same key (the jobs being
+    # posted) gets the same number back on every retry, commit() marks it
+    # used once the post is up, and release() returns it for the next post
+    # if this one failed. A number is never skipped or handed out twice.
+
+    def __init__(self, db_file, seeds):
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(db_file, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS counter_reservations (
+                name TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value INTEGER NOT NULL,
+                PRIMARY KEY (name, key)
+            )""")
+        self.db.execute("CREATE TABLE IF NOT EXISTS counter_free (name TEXT NOT NULL, value INTEGER NOT NULL)")
+        self.values = dict(self.db.execute("SELECT name, value FROM counters"))
+        # First run: carry on from post_counter.txt / config.json.
+        for name, seed in seeds.items():
+            if name not in self.values:
+                value = seed()
+                self.db.execute("INSERT INTO counters (name, value) VALUES (?, ?)", (name, value))
+                self.values[name] = value
+
+    def reserve(self, name, key):
+        with self.lock:
+            row = self.db.execute("SELECT value FROM counter_reservations WHERE name = ? AND key = ?",
+                                  (name, key)).fetchone()
+            if row is not None:
+                return row[0]
+            self.db.execute("BEGIN IMMEDIATE")
+            free = self.db.execute("SELECT MIN(value) FROM counter_free WHERE name = ?", (name,)).fetchone()[0]
+            if free is not None:
+                value = free
+                self.db.execute("DELETE FROM counter_free WHERE rowid = "
+                                "(SELECT rowid FROM counter_free WHERE name = ? AND value = ? LIMIT 1)", (name, value))
+            else:
+                value = self.values.get(name, 0) + 1
+                self.db.execute(
+                    "INSERT INTO counters (name, value) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET value = excluded.value", (name, value))
+            self.db.execute("INSERT INTO counter_reservations (name, key, value) VALUES (?, ?, ?)", (name, key, value))
+            self.db.execute("COMMIT")
+            self.values[name] = max(self.values.get(name, 0), value)
+            return value
+
+    def commit(self, name, key):
+        with self.lock:
+            self.db.execute("DELETE FROM counter_reservations WHERE name = ? AND key = ?", (name, key))
+
+    def release(self, name, key):
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            self.db.execute("""
+                INSERT INTO counter_free (name, value)
+                SELECT name, value FROM counter_reservations WHERE name = ? AND key = ?""", (name, key))
+            self.db.execute("DELETE FROM counter_reservations WHERE name = ? AND key = ?", (name, key))
+            self.db.execute("COMMIT")
+
+    def release_orphans(self, name, active_job_ids):
+        # A post cut short by a crash neither committed nor released its
+        # number. Keeps the reservations whose jobs are all still queued (the
+        # retry takes them back) and frees the rest. Returns how many it freed.
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            orphans = []
+            for key, value in self.db.execute("SELECT key, value FROM counter_reservations WHERE name = ?", (name,)):
+                try:
+                    needed = {int(job_id) for job_id in key.split(",")} <= active_job_ids
+                except ValueError:
+                    needed = False  # not a pipeline post, e.g. the GUI's test upload
+                if not needed:
+                    orphans.append((key, value))
+            self.db.executemany("INSERT INTO counter_free (name, value) VALUES (?, ?)",
+                                [(name, value) for _, value in orphans])
+            self.db.executemany("DELETE FROM counter_reservations WHERE name = ? AND key = ?",
+                                [(name, key) for key, _ in orphans])
+            self.db.execute("COMMIT")
+            return len(orphans)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+def open_counter_store(settings):
+    def legacy_post_counter():
+        try:
+            with open(settings.fb_counter_file, "r") as f:
+                return int(f.read().strip())
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def legacy_ig_counter():
+        return settings.ig_counter
+
+    return CounterStore(settings.state_db_file, {
+        "fb_post": legacy_post_counter,
+        "ig_post": legacy_ig_counter,
+    })
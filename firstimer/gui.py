@@ -0,0 +1,265 @@
+import logging
+import os
+import queue
+import subprocess
+import threading
+
+import tkinter as tk
+from tkinter import filedialog, messagebox
+from tkinter import scrolledtext
+from tkinter import ttk
+
+from .config import CONFIG_FILE, ConfigError, load_settings, update_config
+from .counters import open_counter_store
+from .logs import setup_logging
+from .metrics import metrics_from_settings
+from .pipeline import Pipeline
+from .sessions import session_from_settings
+
+# --- GUI APP CLASS ---
+
+class App:
+    METRICS_REFRESH_MS = 2000
+    METRICS_PANEL_ROWS = 6
+
+    def __init__(self, root, settings, metrics):
+        self.root = root
+        self.settings = settings
+        self.metrics = metrics
+        # None: each platform watches its configured folder; Browse sets one for both.
+        self.watch_directory = None
+        self.pipeline = None
+        self.root.title("📷 Facebook & Instagram Auto-Uploader")
+        self.root.geometry("780x560")
+        self.root.resizable(False, False)
+        self.stop_event = threading.Event()
+
+        # Colors
+        FB_BLUE = "#1877F2"
+        LIGHTER_BLUE = "#1C8EF9"
+        DARKER_BLUE = "#0e5cbf"
+        WHITE = "#FFFFFF"
+        BLACK = "#202124"
+        GREEN = "#28a745"
+        RED = "#dc3545"
+
+        self.root.configure(bg=FB_BLUE)
+        self.style = ttk.Style()
+        self.style.theme_use("clam")
+        self.style.configure("TFrame", background=FB_BLUE)
+        self.style.configure("TButton", background=LIGHTER_BLUE, foreground=WHITE, font=("Segoe UI", 11, "bold"))
+        self.style.map("TButton", background=[('active', DARKER_BLUE)])
+
+        # Frame for main controls
+        self.frame = ttk.Frame(root, padding=20, style="TFrame")
+        self.frame.pack(fill=tk.BOTH, expand=True)
+
+        # Title
+        title_label = tk.Label(self.frame, text="🎯 Facebook & Instagram Auto-Uploader", font=("Segoe UI", 19, "bold"),
+                               bg=FB_BLUE, fg=WHITE)
+        title_label.pack(pady=(0, 10))
+
+        # Directory info
+        dir_frame = tk.Frame(self.frame, bg=FB_BLUE)
+        dir_frame.pack(pady=(0, 10), fill=tk.X)
+        tk.Label(dir_frame, text="Screenshot Directory:", bg=FB_BLUE, fg=WHITE, font=("Segoe UI", 11)).pack(side=tk.LEFT)
+        self.dir_entry = tk.Entry(dir_frame, width=50, font=("Segoe UI", 10))
+        self.dir_entry.insert(0, " | ".join(settings.watch_roots()))
+        self.dir_entry.pack(side=tk.LEFT, padx=(8, 0))
+        ttk.Button(dir_frame, text="Browse", command=self.browse_folder).pack(side=tk.LEFT, padx=(8, 0))
+
+        # Control buttons
+        btn_frame = tk.Frame(self.frame, bg=FB_BLUE)
+        btn_frame.pack(pady=(0, 15), fill=tk.X)
+        self.start_button = ttk.Button(btn_frame, text="▶️ Start Watching", command=self.start_program)
+        self.start_button.pack(side=tk.LEFT, padx=7, fill=tk.X, expand=True)
+        self.stop_button = ttk.Button(btn_frame, text="⏹️ Stop", command=self.stop_program, state=tk.DISABLED)
+        self.stop_button.pack(side=tk.LEFT, padx=7, fill=tk.X, expand=True)
+        self.ig_test_button = ttk.Button(btn_frame, text="🧪 Test IG Upload", command=self.test_ig_upload)
+        self.ig_test_button.pack(side=tk.LEFT, padx=7, fill=tk.X, expand=True)
+
+        # Step timings: p50/p95 of the slowest steps and throughput
+        self.metrics_var = tk.StringVar()
+        self.metrics_var.set("⏱️ No timings yet.")
+        self.metrics_panel = tk.Label(self.frame, textvariable=self.metrics_var, justify=tk.LEFT, anchor=tk.NW,
+                                      height=self.METRICS_PANEL_ROWS + 1, bg=DARKER_BLUE, fg=WHITE,
+                                      font=("Consolas", 9))
+        self.metrics_panel.pack(fill=tk.X)
+
+        # Log Viewer
+        self.log_viewer = scrolledtext.ScrolledText(
+            self.frame,
+            width=90,
+            height=14,
+            wrap=tk.WORD,
+            bg=BLACK,
+            fg=WHITE,
+            insertbackground=WHITE,
+            font=("Consolas", 10)
+        )
+        self.log_viewer.pack(fill=tk.BOTH, expand=True, pady=8)
+
+        # Status bar
+        self.status_var = tk.StringVar()
+        self.status_var.set("Ready.")
+        self.status_bar = tk.Label(root, textvariable=self.status_var, bd=1, relief=tk.SUNKEN, anchor=tk.W,
+                                  bg=DARKER_BLUE, fg=WHITE, font=("Segoe UI", 10))
+        self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+
+        self.ui_queue = queue.SimpleQueue()
+        self.root.after(self.settings.log_flush_ms, self.drain_ui_queue)
+        self.root.after(self.METRICS_REFRESH_MS, self.refresh_metrics_panel)
+
+    # Safe to call from any thread: messages are queued and the Tk main loop
+    # drains them in batches on a timer.
+    def set_status(self, msg):
+        self.ui_queue.put(("status", msg))
+
+    def log_message(self, message):
+        self.ui_queue.put(("log", message))
+
+    def drain_ui_queue(self):
+        lines = []
+        status = None
+        try:
+            while len(lines) < 500:
+                kind, text = self.ui_queue.get_nowait()
+                if kind == "log":
+                    lines.append(text)
+                    status = text
+                elif kind == "finished":
+                    self.program_finished()
+                else:
+                    status = text
+        except queue.Empty:
+            pass
+
+        if lines:
+            self.log_viewer.insert(tk.END, "\n".join(lines) + "\n")
+            # Keep only the newest log_max_lines lines on screen.
+            max_lines = self.settings.log_max_lines
+            line_count = int(self.log_viewer.index("end-1c").split(".")[0]) - 1
+            if line_count > max_lines:
+                self.log_viewer.delete("1.0", f"{line_count - max_lines + 1}.0")
+            self.log_viewer.see(tk.END)
+        if status is not None:
+            self.status_var.set(status if len(status) < 120 else status[:120]+"...")
+        self.root.after(self.settings.log_flush_ms, self.drain_ui_queue)
+
+    def refresh_metrics_panel(self):
+        summary = self.metrics.summary()
+        if summary:
+            slowest = sorted(summary.items(), key=lambda item: item[1][2], reverse=True)[:self.METRICS_PANEL_ROWS]
+            lines = [f"⏱️ {self.metrics.jobs_per_hour():.1f} jobs/hour"]
+            lines += [f"{step[:34]:<34} p50 {p50:7.2f}s   p95 {p95:7.2f}s   n={count}"
+                      for step, (count, p50, p95) in slowest]
+            self.metrics_var.set("\n".join(lines))
+        self.root.after(self.METRICS_REFRESH_MS, self.refresh_metrics_panel)
+
+    def browse_folder(self):
+        folder_selected = filedialog.askdirectory(
+            title="Select Screenshot Directory",
+            initialdir=self.dir_entry.get() if os.path.exists(self.dir_entry.get()) else os.getcwd()
+        )
+        if folder_selected:
+            self.dir_entry.delete(0, tk.END)
+            self.dir_entry.insert(0, folder_selected)
+            self.watch_directory = folder_selected
+            self.log_message(f"📁 Screenshot directory set to: {folder_selected}")
+            if self.settings.remember_settings:
+                try:
+                    update_config({"fb_watch_folder": folder_selected, "ig_watch_folder": folder_selected},
+                                  self.settings.config_file)
+                except (OSError, ValueError) as e:
+                    self.log_message(f"⚠️ Could not save the screenshot directory: {e}")
+
+    def start_program(self):
+        self.start_button.config(state=tk.DISABLED)
+        self.stop_button.config(state=tk.NORMAL)
+        self.ig_test_button.config(state=tk.DISABLED)
+        self.stop_event.clear()
+        self.log_message("🚦 Starting program...")
+        threading.Thread(target=self.run_program, daemon=True).start()
+
+    def stop_program(self):
+        self.stop_button.config(state=tk.DISABLED)
+        # run_program's thread tears the pipeline down once it sees the event
+        # and only then turns Start back on: a second pipeline must not open
+        # the queue and browsers while this one's uploads are finishing.
+        self.set_status("Stopping...")
+        self.stop_event.set()
+
+    def run_program(self):
+        pipeline = None
+        try:
+            pipeline = Pipeline(self.settings, self.log_message, self.watch_directory, self.metrics)
+            self.pipeline = pipeline
+            pipeline.start()
+            self.stop_event.wait()
+        except Exception as e:
+            error_message = f"❌ Error: {str(e)}"
+            logging.error(error_message)
+            self.log_message(error_message)
+            self.set_status("Error. See log.")
+        finally:
+            if pipeline is not None:
+                pipeline.stop()
+            if self.pipeline is pipeline:
+                self.pipeline = None
+            if self.stop_event.is_set():
+                logging.info("Program stopped.")
+                self.log_message("⛔ Program stopped.")
+                self.set_status("Stopped.")
+            # Through the UI queue like every other update from this thread.
+            self.ui_queue.put(("finished", None))
+
+    def program_finished(self):
+        # On the Tk thread, once the pipeline is fully torn down.
+        self.start_button.config(state=tk.NORMAL)
+        self.stop_button.config(state=tk.DISABLED)
+        self.ig_test_button.config(state=tk.NORMAL)
+
+    def test_ig_upload(self):
+        image_path = filedialog.askopenfilename(
+            title="Select an image for Instagram upload test",
+            filetypes=[("Image Files", "*.png;*.jpg;*.jpeg")]
+        )
+        if image_path:
+            try:
+                from .uploader import ScreenshotUploader
+
+                session = session_from_settings(self.settings, "instagram")
+                session.start()
+                counters = open_counter_store(self.settings)
+                uploader = ScreenshotUploader(session, self.log_message, self.settings, counters, self.metrics)
+                uploader.upload("instagram", image_path)
+                counters.close()
+                session.close()
+                self.log_message("✅ IG upload test finished.")
+            except Exception as e:
+                self.log_message(f"❌ IG Test error: {e}")
+
+# --- MAIN ---
+
+def main(config_file=CONFIG_FILE):
+    # Launch Chrome via batch file if present.
+    batch_file = os.path.abspath("launch_chrome_Version2.bat")
+    if os.path.isfile(batch_file):
+        subprocess.Popen([batch_file], shell=True)
+
+    try:
+        settings = load_settings(config_file)
+    except ConfigError as e:
+        root = tk.Tk()
+        root.withdraw()
+        messagebox.showerror("Invalid settings", str(e))
+        root.destroy()
+        return 1
+    log_listener = setup_logging(settings.log_file)
+    metrics = metrics_from_settings(settings)
+    root = tk.Tk()
+    app = App(root, settings, metrics)
+    root.mainloop()
+    metrics.close()
+    log_listener.stop()
+    return 0
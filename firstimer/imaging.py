@@ -0,0 +1,263 @@
+import collections
+import importlib.util
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .upload_queue import PLATFORMS
+
+def pillow_available():
+    # Pillow is optional; without it screenshots upload as-is.
+    return importlib.util.find_spec("PIL") is not None
+
+# --- IMAGE PREPROCESSING ---
+
+# Instagram accepts 4:5 portrait up to 1.91:1 landscape at 1080px wide;
+# Facebook re-encodes anything past 2048px on the long edge.
+PLATFORM_IMAGE_SPECS = {
+    "facebook": {"max_edge": 2048},
+    "instagram": {"max_width": 1080, "min_ratio": 0.8, "max_ratio": 1.91},
+}
+
+def render_for_platform(src, dst, spec, image_format, quality):
+    # Runs in a worker process, so it only takes plain picklable arguments.
+    from PIL import Image
+
+    with Image.open(src) as img:
+        img = img.convert("RGB")
+        width, height = img.size
+        ratio = width / height
+        if "min_ratio" in spec and ratio < spec["min_ratio"]:
+            new_height = round(width / spec["min_ratio"])
+            top = (height - new_height) // 2
+            img = img.crop((0, top, width, top + new_height))
+        elif "max_ratio" in spec and ratio > spec["max_ratio"]:
+            new_width = round(height * spec["max_ratio"])
+            left = (width - new_width) // 2
+            img = img.crop((left, 0, left + new_width, height))
+
+        width, height = img.size
+        scale = 1.0
+        if "max_width" in spec:
+            scale = min(scale, spec["max_width"] / width)
+        if "max_edge" in spec:
+            scale = min(scale, spec["max_edge"] / max(width, height))
+        if scale < 1.0:
+            img = img.resize((round(width * scale), round(height * scale)), Image.LANCZOS)
+
+        tmp = f"{dst}.tmp"
+        img.save(tmp, format=image_format, quality=quality, optimize=True)
+    os.replace(tmp, dst)
+    return dst
+
+class ImagePreprocessor:
+    # Resizes/re-encodes screenshots per platform in a process pool. Output is
+    # cached by content hash, so retries and repeated platforms reuse it.
+
+    def __init__(self, cache_dir, log_callback, image_format="JPEG", quality=85, workers=2, cache_days=7):
+        # File inputs need absolute paths.
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.log_callback = log_callback
+        self.image_format = image_format
+        self.quality = quality
+        self.lock = threading.Lock()
+        self.futures = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.prune(cache_days * 86400)
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+
+    def cache_path(self, content_hash, platform):
+        extension = "webp" if self.image_format == "WEBP" else "jpg"
+        return os.path.join(self.cache_dir, f"{content_hash}-{platform}-q{self.quality}.{extension}")
+
+    def submit(self, path, content_hash, platform):
+        dst = self.cache_path(content_hash, platform)
+        with self.lock:
+            future = self.futures.get(dst)
+            if future is None and not os.path.exists(dst):
+                future = self.executor.submit(render_for_platform, path, dst, PLATFORM_IMAGE_SPECS[platform],
+                                              self.image_format, self.quality)
+                self.futures[dst] = future
+        return dst, future
+
+    def prefetch(self, path, content_hash, platforms=PLATFORMS):
+        for platform in platforms:
+            self.submit(path, content_hash, platform)
+
+    def prepare(self, path, content_hash, platform, timeout=60):
+        # Falls back to the original file if anything goes wrong.
+        dst, future = self.submit(path, content_hash, platform)
+        try:
+            if future is not None:
+                future.result(timeout=timeout)
+            return dst
+        except Exception as e:
+            logging.warning(f"Preprocessing {path} for {platform} failed: {e}")
+            self.log_callback(f"⚠️ Could not resize screenshot for {platform}, uploading the original.")
+            return path
+        finally:
+            with self.lock:
+                self.futures.pop(dst, None)
+
+    def prune(self, max_age):
+        cutoff = time.time() - max_age
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+def create_preprocessor(settings, log_callback):
+    if not settings.preprocess_images:
+        return None
+    if not pillow_available():
+        log_callback("ℹ️ Pillow is not installed, screenshots will be uploaded without resizing.")
+        return None
+    return ImagePreprocessor(settings.preprocess_cache_dir, log_callback, settings.preprocess_format,
+                             settings.preprocess_quality, settings.preprocess_workers,
+                             settings.preprocess_cache_days)
+
+# --- NEAR-DUPLICATE DETECTION ---
+
+def dhash(path, hash_size=8):
+    # Difference hash: 64 bits of "is this pixel brighter than its right
+    # neighbour" on a tiny grayscale thumbnail.
+    from PIL import Image
+
+    with Image.open(path) as img:
+        img = img.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+        pixels = list(img.getdata())
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+class BKTree:
+    # Metric tree over Hamming distance: a lookup only descends into children
+    # whose edge distance is within max_distance of the query's. At 64 bits
+    # and a distance of 6 that still visits a good part of a large tree, so
+    # callers keep it small.
+
+    def __init__(self):
+        self.root = None  # [hash, items, {distance: child}]
+
+    def add(self, value, item):
+        if self.root is None:
+            self.root = [value, [item], {}]
+            return
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value, max_distance):
+        found = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= max_distance:
+                found.extend((distance, item) for item in node[1])
+            for edge, child in node[2].items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        return found
+
+def to_signed64(value):
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+class PerceptualIndex:
+    # dHashes of recently queued screenshots, persisted to the state database
+    # (kept for retention_days) so the history survives restarts. Only the
+    # ones inside the match window are in the BK-tree: a BK-tree can't delete,
+    # so it is rebuilt from `recent` once more than half of it has expired.
+
+    def __init__(self, db_file, max_distance=6, window=600, retention_days=30):
+        self.max_distance = max_distance
+        self.window = window
+        self.lock = threading.Lock()
+        self.tree = BKTree()
+        self.recent = collections.deque()  # (seen_at, hash, path, content_hash), oldest first
+        self.expired = 0
+        self.db = sqlite3.connect(db_file, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS phashes (hash INTEGER NOT NULL, path TEXT NOT NULL, seen_at REAL NOT NULL)")
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(phashes)")]
+        if "content_hash" not in columns:
+            self.db.execute("ALTER TABLE phashes ADD COLUMN content_hash TEXT")
+        now = time.time()
+        self.db.execute("DELETE FROM phashes WHERE seen_at < ?", (now - retention_days * 86400,))
+        rows = self.db.execute("SELECT hash, path, seen_at, content_hash FROM phashes WHERE seen_at >= ? "
+                               "ORDER BY seen_at", (now - window,))
+        for value, path, seen_at, content_hash in rows:
+            self._insert(value & ((1 << 64) - 1), path, seen_at, content_hash)
+
+    def _insert(self, value, path, seen_at, content_hash):
+        self.recent.append((seen_at, value, path, content_hash))
+        self.tree.add(value, (path, seen_at, content_hash))
+
+    def _expire(self, cutoff):
+        while self.recent and self.recent[0][0] < cutoff:
+            self.recent.popleft()
+            self.expired += 1
+        if self.expired > len(self.recent):
+            self.tree = BKTree()
+            for seen_at, value, path, content_hash in self.recent:
+                self.tree.add(value, (path, seen_at, content_hash))
+            self.expired = 0
+
+    def find_similar(self, value, path=None, content_hash=None):
+        # Closest match seen within the time window, as (path, distance). The
+        # file's own earlier entry (same path or same content, e.g. a retry
+        # after a restart) is not a near-duplicate of it.
+        cutoff = time.time() - self.window
+        with self.lock:
+            self._expire(cutoff)
+            matches = [(distance, item) for distance, item in self.tree.search(value, self.max_distance)
+                       if item[1] >= cutoff and item[0] != path
+                       and (content_hash is None or item[2] != content_hash)]
+        if not matches:
+            return None
+        distance, (original, _, _) = min(matches, key=lambda match: match[0])
+        return original, distance
+
+    def add(self, value, path, content_hash=None):
+        seen_at = time.time()
+        with self.lock:
+            self._insert(value, path, seen_at, content_hash)
+            self.db.execute("INSERT INTO phashes (hash, path, seen_at, content_hash) VALUES (?, ?, ?, ?)",
+                            (to_signed64(value), path, seen_at, content_hash))
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+def create_perceptual_index(settings, log_callback):
+    if not settings.phash_enabled:
+        return None
+    if not pillow_available():
+        log_callback("ℹ️ Pillow is not installed, near-duplicate detection is off.")
+        return None
+    return PerceptualIndex(settings.state_db_file, settings.phash_max_distance, settings.phash_window_seconds,
+                           settings.phash_retention_days)
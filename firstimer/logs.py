@@ -0,0 +1,26 @@
+import logging
+import logging.handlers
+import queue
+import sys
+
+# --- LOGGING ---
+
+def setup_logging(log_file, console=False):
+    # Threads only enqueue records; a QueueListener thread does the disk
+    # writes, so a slow disk never stalls an upload step.
+    records = queue.SimpleQueue()
+    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    handlers = []
+    file_handler = logging.FileHandler(log_file, mode="a", encoding="utf-8")
+    file_handler.setFormatter(formatter)
+    handlers.append(file_handler)
+    if console:
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+    listener = logging.handlers.QueueListener(records, *handlers)
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.addHandler(logging.handlers.QueueHandler(records))
+    listener.start()
+    return listener
@@ -0,0 +1,158 @@
+import collections
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+# --- METRICS ---
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+class Metrics:
+    # Timed spans for every pipeline step (detect, stabilize, each page wait
+    # and click, caption, upload, trash, ...). Each span is appended to a
+    # rotating JSONL file through a QueueListener, the same way the program
+    # log is written, so recording one never waits on the disk. The last
+    # `window` durations per step are kept in memory for percentiles, and a
+    # Prometheus textfile is rewritten every `export_interval` seconds.
+    # With no files configured it only keeps the in-memory numbers.
+
+    def __init__(self, jsonl_file=None, prometheus_file=None, max_bytes=5 * 1024 * 1024, backups=3, window=500,
+                 export_interval=15):
+        self.prometheus_file = prometheus_file
+        self.window = window
+        self.lock = threading.Lock()
+        self.durations = {}  # step -> deque of the latest durations
+        self.totals = collections.defaultdict(float)  # step -> seconds, all time
+        self.counts = collections.Counter()  # (step, outcome) -> spans, all time
+        self.finished_jobs = collections.deque()  # completion times in the last hour
+        self.started_at = time.monotonic()
+
+        self.listener = None
+        self.span_logger = None
+        if jsonl_file:
+            records = queue.SimpleQueue()
+            file_handler = logging.handlers.RotatingFileHandler(jsonl_file, maxBytes=max_bytes, backupCount=backups,
+                                                                encoding="utf-8")
+            file_handler.setFormatter(logging.Formatter("%(message)s"))
+            self.listener = logging.handlers.QueueListener(records, file_handler)
+            self.span_logger = logging.getLogger(f"firstimer.spans.{id(self)}")
+            self.span_logger.propagate = False
+            self.span_logger.setLevel(logging.INFO)
+            self.span_logger.addHandler(logging.handlers.QueueHandler(records))
+            self.listener.start()
+
+        self.stop_event = threading.Event()
+        self.exporter = None
+        if prometheus_file:
+            self.exporter = threading.Thread(target=self._export_loop, args=(export_interval,), daemon=True)
+            self.exporter.start()
+
+    def record(self, step, seconds, outcome="ok", **fields):
+        with self.lock:
+            durations = self.durations.get(step)
+            if durations is None:
+                durations = self.durations[step] = collections.deque(maxlen=self.window)
+            durations.append(seconds)
+            self.totals[step] += seconds
+            self.counts[(step, outcome)] += 1
+        if self.span_logger is not None:
+            span = {"ts": round(time.time(), 3), "step": step, "seconds": round(seconds, 4), "outcome": outcome}
+            span.update(fields)
+            self.span_logger.info(json.dumps(span, ensure_ascii=False))
+
+    @contextmanager
+    def span(self, step, **fields):
+        started = time.monotonic()
+        outcome = "ok"
+        try:
+            yield
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            self.record(step, time.monotonic() - started, outcome, **fields)
+
+    def job_finished(self):
+        with self.lock:
+            self.finished_jobs.append(time.monotonic())
+
+    def jobs_per_hour(self):
+        now = time.monotonic()
+        with self.lock:
+            while self.finished_jobs and now - self.finished_jobs[0] > 3600:
+                self.finished_jobs.popleft()
+            finished = len(self.finished_jobs)
+        # Extrapolate during the first hour instead of reporting a ramp.
+        elapsed = max(60.0, min(3600.0, now - self.started_at))
+        return finished * 3600.0 / elapsed
+
+    def summary(self):
+        # {step: (count, p50, p95)} over each step's recent window.
+        with self.lock:
+            snapshot = {step: sorted(durations) for step, durations in self.durations.items()}
+        return {step: (len(values), percentile(values, 0.5), percentile(values, 0.95))
+                for step, values in snapshot.items()}
+
+    def export_prometheus(self):
+        summary = self.summary()
+        with self.lock:
+            totals = dict(self.totals)
+            counts = dict(self.counts)
+        lines = ["# HELP firstimer_step_seconds Duration of pipeline steps over the recent window.",
+                 "# TYPE firstimer_step_seconds summary"]
+        step_counts = collections.Counter()
+        for (step, _), count in counts.items():
+            step_counts[step] += count
+        for step, (_, p50, p95) in sorted(summary.items()):
+            lines.append(f'firstimer_step_seconds{{step="{step}",quantile="0.5"}} {p50:.6f}')
+            lines.append(f'firstimer_step_seconds{{step="{step}",quantile="0.95"}} {p95:.6f}')
+            lines.append(f'firstimer_step_seconds_sum{{step="{step}"}} {totals[step]:.6f}')
+            lines.append(f'firstimer_step_seconds_count{{step="{step}"}} {step_counts[step]}')
+        lines.append("# HELP firstimer_step_total Pipeline steps by outcome.")
+        lines.append("# TYPE firstimer_step_total counter")
+        for (step, outcome), count in sorted(counts.items()):
+            lines.append(f'firstimer_step_total{{step="{step}",outcome="{outcome}"}} {count}')
+        lines.append("# HELP firstimer_jobs_per_hour Screenshots fully posted in the last hour.")
+        lines.append("# TYPE firstimer_jobs_per_hour gauge")
+        lines.append(f"firstimer_jobs_per_hour {self.jobs_per_hour():.3f}")
+        # Written beside the target and swapped in, so a scraper never reads half a file.
+        tmp_file = f"{self.prometheus_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_file, self.prometheus_file)
+
+    def _export_loop(self, interval):
+        while not self.stop_event.wait(interval):
+            try:
+                self.export_prometheus()
+            except OSError as e:
+                logging.warning(f"Could not write metrics to {self.prometheus_file}: {e}")
+
+    def close(self):
+        self.stop_event.set()
+        if self.exporter is not None:
+            self.exporter.join(timeout=2)
+            try:
+                self.export_prometheus()
+            except OSError:
+                pass
+        if self.listener is not None:
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+            self.listener = None
+            self.span_logger.handlers.clear()
+            self.span_logger = None
+
+def metrics_from_settings(settings):
+    return Metrics(settings.metrics_file, settings.metrics_prometheus_file, settings.metrics_max_bytes,
+                   settings.metrics_backups, settings.metrics_window, settings.metrics_export_interval)
@@ -0,0 +1,272 @@
+import logging
+import os
+import threading
+import time
+import traceback
+
+from .config import ConfigReloader, ConfigStore
+from .counters import POST_COUNTERS, jobs_key, open_counter_store
+from .imaging import create_perceptual_index, create_preprocessor
+from .metrics import Metrics, metrics_from_settings
+from .postprocess import create_postprocessor
+from .sessions import SessionLost, SessionSupervisor, session_pool_from_settings
+from .upload_queue import PLATFORMS, upload_queue_from_settings
+
+# --- PIPELINE ---
+
+MAX_BATCH_ITEMS = 10  # an Instagram carousel takes at most 10 items
+STOP_GRACE_SECONDS = 120  # how long stop() waits for posts in progress
+
+class UploadWorker(threading.Thread):
+    # One pipeline stage: drains a single platform's jobs one post at a time.
+    # Each post runs on a leased browser session, so a session is never driven
+    # by two uploads at once, and a failure only retries this platform. With
+    # batching on, screenshots that arrive together share one post.
+
+    def __init__(self, upload_queue, session_pool, platform, stop_event, log_callback, make_uploader,
+                 preprocessor=None, metrics=None, batch_max_items=1, batch_window=0, postprocessor=None):
+        super().__init__(daemon=True)
+        self.upload_queue = upload_queue
+        self.metrics = metrics or Metrics()
+        self.session_pool = session_pool
+        self.platform = platform
+        self.make_uploader = make_uploader
+        self.preprocessor = preprocessor
+        self.postprocessor = postprocessor
+        self.stop_event = stop_event
+        self.log_callback = log_callback
+        self.batch_max_items = max(1, min(batch_max_items, MAX_BATCH_ITEMS))
+        self.batch_window = batch_window
+
+    def run(self):
+        while not self.stop_event.is_set():
+            batch = self.upload_queue.claim_batch(self.platform, timeout=1, max_items=self.batch_max_items,
+                                                  window=self.batch_window)
+            jobs = []
+            for job in batch:
+                if os.path.exists(job.path):
+                    jobs.append(job)
+                else:
+                    self.upload_queue.fail(job, "file no longer exists", retry=False)
+                    self.log_callback(f"⚠️ Queued screenshot is gone, dropping it: {job.path}")
+            if jobs:
+                self.post(jobs)
+
+    def post(self, jobs):
+        names = jobs[0].path if len(jobs) == 1 else f"{len(jobs)} screenshots"
+        attempt = max(job.attempts for job in jobs) + 1
+        self.log_callback(f"🚚 [{self.platform}] Uploading (attempt {attempt}): {names}")
+        upload_paths = [job.path for job in jobs]
+        if self.preprocessor is not None:
+            with self.metrics.span(f"preprocess:{self.platform}"):
+                upload_paths = [self.preprocessor.prepare(job.path, job.content_hash, self.platform)
+                                for job in jobs]
+        browser_lost = False
+        lease_started = time.monotonic()
+        try:
+            with self.session_pool.lease(self.platform) as session:
+                upload_started = time.monotonic()
+                self.metrics.record("lease", upload_started - lease_started)
+                try:
+                    succeeded = self.make_uploader(session).upload(self.platform, upload_paths, jobs_key(jobs))
+                except Exception:
+                    logging.error(f"{self.platform} worker crashed on {names}:\n{traceback.format_exc()}")
+                    succeeded = False
+                browser_lost = not succeeded and not session.is_healthy()
+                outcome = "ok" if succeeded else "browser_lost" if browser_lost else "failed"
+                self.metrics.record(f"upload:{self.platform}", time.monotonic() - upload_started, outcome,
+                                    items=len(jobs), attempt=attempt)
+        except SessionLost:
+            succeeded = False
+            browser_lost = True
+        except Exception:
+            logging.error(f"{self.platform} worker crashed on {names}:\n{traceback.format_exc()}")
+            succeeded = False
+
+        for job in jobs:
+            error = f"{self.platform} upload failed"
+            if browser_lost:
+                # Not the job's fault: replay it without spending an attempt,
+                # until it has happened too often in a row.
+                if job.replays < self.upload_queue.max_replays:
+                    delay = self.upload_queue.release(job, f"{self.platform} browser went away")
+                    self.log_callback(f"♻️ [{self.platform}] Browser went away, replaying {job.path} in {delay}s.")
+                    continue
+                error = f"{self.platform} browser went away {job.replays + 1} times in a row"
+            if succeeded:
+                all_done = self.upload_queue.complete(job)
+                states = self._report(job)
+                if all_done:
+                    self.metrics.job_finished()
+                    if self.postprocessor is not None:
+                        self.postprocessor.submit(job.path, job.content_hash, sorted(states))
+                continue
+            delay = self.upload_queue.fail(job, error)
+            if delay is None:
+                self.log_callback(f"❌ [{self.platform}] Giving up on {job.path} after {job.attempts + 1} attempts.")
+            else:
+                self.log_callback(f"🔁 [{self.platform}] Will retry {job.path} in {delay}s.")
+            self._report(job)
+
+    def _report(self, job):
+        states = self.upload_queue.status(job.content_hash)
+        summary = ", ".join(f"{platform}={state}" for platform, state in states.items())
+        self.log_callback(f"📊 {os.path.basename(job.path)}: {summary}")
+        return states
+
+
+class Pipeline:
+    # Everything between the watched folder and the browsers. The GUI and
+    # the headless daemon both run one of these; heavy dependencies are
+    # only imported once start() is called. start() reads `settings`'
+    # config file afresh, so edits made since it was loaded count; uploads
+    # take the latest snapshot from the config store, so an edited
+    # config.json reaches the next post without a restart.
+
+    def __init__(self, settings, log_callback, watch_directory=None, metrics=None):
+        self.settings = settings
+        # Metrics handed in (the GUI's) outlive this pipeline; our own don't.
+        self.owns_metrics = metrics is None
+        self.metrics = metrics
+        self.log_callback = log_callback
+        # A folder given here (GUI, --directory) feeds every platform;
+        # otherwise each platform watches its own configured folder.
+        self.watch_directory = watch_directory
+        self.watch_roots = {}
+        self.stop_event = threading.Event()
+        self.config = None
+        self.config_reloader = None
+        self.session_pool = None
+        self.supervisor = None
+        self.upload_queue = None
+        self.counters = None
+        self.preprocessor = None
+        self.postprocessor = None
+        self.perceptual_index = None
+        self.observer = None
+        self.catchups = []
+        self.scan_manifest = None
+        self.workers = []
+
+    def create_session_pool(self):
+        # Overridden by the benchmarks to drive fake browsers.
+        return session_pool_from_settings(self.settings, self.log_callback)
+
+    def make_uploader(self, session):
+        from .uploader import ScreenshotUploader
+        # The snapshot current when the post starts; it stays put for the
+        # whole post even if config.json is reloaded meanwhile.
+        settings = self.config.current() if self.config is not None else self.settings
+        return ScreenshotUploader(session, self.log_callback, settings, self.counters, self.metrics)
+
+    def start(self):
+        from watchdog.observers import Observer
+        from .catchup import create_catchup_scanners
+        from .watcher import ScreenshotHandler
+
+        self.stop_event.clear()
+        self.config = ConfigStore(self.settings.config_file)
+        self.settings = settings = self.config.current()
+        self.watch_roots = {self.watch_directory: PLATFORMS} if self.watch_directory else settings.watch_roots()
+        if self.metrics is None:
+            self.metrics = metrics_from_settings(settings)
+        if settings.config_reload_interval > 0:
+            self.config_reloader = ConfigReloader(self.config, self.stop_event, self.log_callback,
+                                                  settings.config_reload_interval)
+            self.config_reloader.start()
+        self.session_pool = self.create_session_pool()
+        self.session_pool.start()
+        logging.info(f"Browser session pool started with {settings.chrome_sessions} session(s).")
+
+        self.supervisor = SessionSupervisor(self.session_pool, self.stop_event, settings.session_health_interval)
+        self.supervisor.start()
+        logging.info("Session supervisor started.")
+
+        self.upload_queue = upload_queue_from_settings(settings)
+        self.counters = open_counter_store(settings)
+        for platform, counter in POST_COUNTERS.items():
+            freed = self.counters.release_orphans(counter, self.upload_queue.active_ids(platform))
+            if freed:
+                logging.info(f"Freed {freed} {counter} number(s) reserved by posts that will not be retried.")
+        self.preprocessor = create_preprocessor(settings, self.log_callback)
+        self.perceptual_index = create_perceptual_index(settings, self.log_callback)
+        self.postprocessor = create_postprocessor(settings, self.log_callback, self.metrics)
+        # One stage per platform, each with a worker per browser session it
+        # posts on; with a session per platform both stages run side by side.
+        for platform in PLATFORMS:
+            for _ in range(self.session_pool.sessions_for(platform)):
+                worker = UploadWorker(self.upload_queue, self.session_pool, platform, self.stop_event,
+                                      self.log_callback, self.make_uploader, self.preprocessor, self.metrics,
+                                      settings.batch_max_items, settings.batch_window_seconds, self.postprocessor)
+                worker.start()
+                self.workers.append(worker)
+
+        handlers = {}
+        self.observer = Observer()
+        for directory, platforms in self.watch_roots.items():
+            handlers[directory] = ScreenshotHandler(self.upload_queue, self.log_callback, self.stop_event,
+                                                    self.preprocessor, self.perceptual_index,
+                                                    settings.stabilize_debounce_seconds,
+                                                    settings.stabilize_poll_interval, settings.stabilize_timeout,
+                                                    self.metrics, platforms)
+            self.observer.schedule(handlers[directory], directory, recursive=False)
+        self.observer.start()
+        for directory, platforms in self.watch_roots.items():
+            self.log_callback(f"👀 Watching directory: {directory} ({', '.join(platforms)})")
+
+        # Started after the observer so nothing written during the scan is missed.
+        self.catchups, self.scan_manifest = create_catchup_scanners(settings, handlers, self.upload_queue,
+                                                                    self.stop_event, self.log_callback)
+        for catchup in self.catchups:
+            catchup.start()
+
+    def stop(self):
+        # Safe to call more than once, and on a pipeline that failed halfway
+        # through start().
+        self.stop_event.set()
+        if self.observer is not None:
+            try:
+                self.observer.stop()
+                self.observer.join()
+            except Exception:
+                pass
+            self.observer = None
+        # Idle workers notice stop_event within a second; busy ones finish
+        # their post and record it before anything they use is closed.
+        threads = self.workers + self.catchups
+        for thread in threads:
+            thread.join(timeout=2)
+        busy = [thread for thread in threads if thread.is_alive()]
+        if busy:
+            self.log_callback(f"⏳ Waiting for {len(busy)} upload(s) in progress to finish...")
+            deadline = time.monotonic() + STOP_GRACE_SECONDS
+            for thread in busy:
+                thread.join(timeout=max(0.0, deadline - time.monotonic()))
+            busy = [thread for thread in busy if thread.is_alive()]
+        self.workers = []
+        self.catchups = []
+        for thread_name in ("supervisor", "config_reloader"):
+            thread = getattr(self, thread_name)
+            if thread is not None:
+                thread.join(timeout=2)
+                setattr(self, thread_name, None)
+        if busy:
+            # Still stuck: leave their queue, browsers and databases open
+            # rather than pull them out from under them. The job stays
+            # in_progress and is picked up again on the next start.
+            logging.warning(f"{len(busy)} worker(s) still busy after {STOP_GRACE_SECONDS}s, not closing "
+                            f"shared components")
+            self.log_callback(f"⚠️ {len(busy)} upload(s) still running, leaving them to the next start.")
+        for name in ("session_pool", "preprocessor", "postprocessor", "perceptual_index", "scan_manifest",
+                     "upload_queue", "counters"):
+            component = getattr(self, name)
+            if component is not None and not busy:
+                try:
+                    component.close()
+                except Exception:
+                    logging.warning(f"Error while closing {name}: {traceback.format_exc()}")
+            setattr(self, name, None)
+        if self.owns_metrics and self.metrics is not None and not busy:
+            self.metrics.close()
+        if self.owns_metrics:
+            self.metrics = None
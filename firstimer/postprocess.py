@@ -0,0 +1,135 @@
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from .metrics import Metrics
+
+# --- POST-PROCESSING ---
+
+# What happens to a screenshot once every platform has it:
+#   trash   - send it to the Recycle Bin
+#   archive - move it to <archive dir>/<year>/<date>/
+#   zip     - append it to <archive dir>/screenshots-<year>-<month>[-n].zip,
+#             starting a new part once one reaches the size limit
+#   keep    - leave it where it is
+# Every outcome is written to the `posted` index in the state database.
+POSTPROCESS_POLICIES = ("trash", "archive", "zip", "keep")
+POSTPROCESS_MESSAGES = {
+    "trash": "🗑️ Sent screenshot to Recycle Bin: {path}",
+    "archive": "🗄️ Archived screenshot: {path} -> {location}",
+    "zip": "🗜️ Zipped screenshot: {path} -> {location}",
+}
+
+def trash_screenshot(path):
+    import send2trash
+    send2trash.send2trash(os.path.normpath(path))
+
+def unique_path(path):
+    base, extension = os.path.splitext(path)
+    candidate, n = path, 1
+    while os.path.exists(candidate):
+        candidate = f"{base}-{n}{extension}"
+        n += 1
+    return candidate
+
+class PostProcessor:
+    # Runs the policy on a small thread pool, off the upload workers' path:
+    # a slow Recycle Bin or disk never holds up the next post.
+
+    def __init__(self, policy, archive_dir, db_file, log_callback, workers=1, zip_max_bytes=512 * 1024 * 1024,
+                 metrics=None):
+        if policy not in POSTPROCESS_POLICIES:
+            raise ValueError(f"Unknown post-processing policy {policy!r}, expected one of {POSTPROCESS_POLICIES}")
+        self.policy = policy
+        self.archive_dir = os.path.abspath(archive_dir)
+        self.log_callback = log_callback
+        self.zip_max_bytes = zip_max_bytes
+        self.metrics = metrics or Metrics()
+        self.zip_lock = threading.Lock()
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(db_file, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS posted (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                content_hash TEXT NOT NULL,
+                original_path TEXT NOT NULL,
+                platforms TEXT NOT NULL,
+                posted_at REAL NOT NULL,
+                disposition TEXT NOT NULL,
+                location TEXT
+            )""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS posted_hash ON posted (content_hash)")
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="postprocess")
+
+    def submit(self, path, content_hash, platforms):
+        # Only called once every platform reported success.
+        return self.executor.submit(self._process, path, content_hash, platforms, time.time())
+
+    def _process(self, path, content_hash, platforms, posted_at):
+        disposition, location = self.policy, None
+        try:
+            with self.metrics.span(f"postprocess:{self.policy}", path=path):
+                if self.policy == "trash":
+                    trash_screenshot(path)
+                elif self.policy == "archive":
+                    location = self.archive(path, posted_at)
+                elif self.policy == "zip":
+                    location = self.add_to_zip(path, content_hash, posted_at)
+            if self.policy in POSTPROCESS_MESSAGES:
+                message = POSTPROCESS_MESSAGES[self.policy].format(path=path, location=location)
+                self.log_callback(message)
+                logging.info(message)
+        except Exception as e:
+            disposition, location = "error", str(e)
+            logging.warning(f"Post-processing ({self.policy}) failed for {path}: {e}")
+            self.log_callback(f"⚠️ Could not {self.policy} posted screenshot {path}: {e}")
+        with self.lock:
+            self.db.execute("""
+                INSERT INTO posted (content_hash, original_path, platforms, posted_at, disposition, location)
+                VALUES (?, ?, ?, ?, ?, ?)""",
+                (content_hash, path, ",".join(platforms), posted_at, disposition, location))
+
+    def archive(self, path, posted_at):
+        day = time.localtime(posted_at)
+        folder = os.path.join(self.archive_dir, time.strftime("%Y", day), time.strftime("%Y-%m-%d", day))
+        os.makedirs(folder, exist_ok=True)
+        destination = unique_path(os.path.join(folder, os.path.basename(path)))
+        shutil.move(path, destination)
+        return destination
+
+    def current_zip(self, posted_at):
+        os.makedirs(self.archive_dir, exist_ok=True)
+        stem = os.path.join(self.archive_dir, time.strftime("screenshots-%Y-%m", time.localtime(posted_at)))
+        candidate, part = f"{stem}.zip", 1
+        while os.path.exists(candidate) and os.path.getsize(candidate) >= self.zip_max_bytes:
+            part += 1
+            candidate = f"{stem}-{part}.zip"
+        return candidate
+
+    def add_to_zip(self, path, content_hash, posted_at):
+        arcname = f"{time.strftime('%Y-%m-%d', time.localtime(posted_at))}/{content_hash[:12]}-{os.path.basename(path)}"
+        with self.zip_lock:
+            archive_file = self.current_zip(posted_at)
+            # PNG/JPEG are already compressed; storing keeps appends cheap.
+            with zipfile.ZipFile(archive_file, "a", compression=zipfile.ZIP_STORED) as archive:
+                archive.write(path, arcname)
+        os.remove(path)
+        return f"{archive_file}:{arcname}"
+
+    def close(self):
+        # Lets queued post-processing finish; it's only local file work.
+        self.executor.shutdown(wait=True)
+        with self.lock:
+            self.db.close()
+
+def create_postprocessor(settings, log_callback, metrics=None):
+    return PostProcessor(settings.postprocess_policy, settings.postprocess_archive_dir, settings.state_db_file,
+                         log_callback, settings.postprocess_workers,
+                         int(settings.postprocess_zip_max_mb * 1024 * 1024), metrics)
@@ -0,0 +1,263 @@
+import json
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+
+from .tabs import TabRegistry
+from .upload_queue import PLATFORMS
+
+# --- BROWSER SESSIONS ---
+
+class SessionLost(Exception):
+    # The browser behind a lease died and could not be brought back; the
+    # job it was meant for is not at fault.
+    pass
+
+def find_chrome_binary(configured=""):
+    if configured:
+        return configured
+    for name in ("chrome", "google-chrome", "chromium", "chromium-browser"):
+        found = shutil.which(name)
+        if found:
+            return found
+    for path in (r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+                 r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe"):
+        if os.path.isfile(path):
+            return path
+    return None
+
+def session_platforms(index, size, platforms=PLATFORMS):
+    # With a session per platform or more, session N only posts for
+    # platforms[N % len(platforms)] (Facebook on 0, Instagram on 1, ...), so
+    # each profile needs one login. With fewer, one session does everything.
+    if size < len(platforms):
+        return tuple(platforms)
+    return (platforms[index % len(platforms)],)
+
+def session_user_data_dir(user_data_dir, index):
+    if index == 0:
+        return user_data_dir
+    if user_data_dir:
+        return f"{user_data_dir.rstrip(os.sep)}-session{index}"
+    return os.path.abspath(f"chrome-session{index}")
+
+class BrowserSession:
+    # One Chrome instance on its own debug port and user-data-dir, with a
+    # WebDriver attached to it.
+
+    def __init__(self, index, port, user_data_dir, profile_directory, chrome_binary="", start_timeout=20):
+        self.index = index
+        self.port = port
+        self.user_data_dir = user_data_dir
+        self.profile_directory = profile_directory
+        self.chrome_binary = chrome_binary
+        self.start_timeout = start_timeout
+        self.process = None
+        self.driver = None
+        self.attached_to = None
+        self.tabs = TabRegistry(port)
+
+    @property
+    def name(self):
+        return f"session {self.index} (port {self.port})"
+
+    def browser_id(self, timeout=2):
+        # webSocketDebuggerUrl changes with every Chrome launch, so it also
+        # tells a restarted browser apart from the one the driver attached to.
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/json/version", timeout=timeout) as response:
+                return json.load(response).get("webSocketDebuggerUrl", "")
+        except (OSError, ValueError):
+            return None
+
+    def endpoint_alive(self, timeout=2):
+        return self.browser_id(timeout) is not None
+
+    def launch(self):
+        # Only start Chrome if nothing already listens on the port, e.g. the
+        # instance from launch_chrome_Version2.bat.
+        if self.endpoint_alive():
+            return
+        binary = find_chrome_binary(self.chrome_binary)
+        if not binary:
+            raise RuntimeError(f"No Chrome listening on port {self.port} and no Chrome binary found.")
+        args = [binary, f"--remote-debugging-port={self.port}", "--no-first-run", "--no-default-browser-check"]
+        if self.user_data_dir:
+            args.append(f"--user-data-dir={self.user_data_dir}")
+        if self.profile_directory:
+            args.append(f"--profile-directory={self.profile_directory}")
+        self.process = subprocess.Popen(args)
+        deadline = time.monotonic() + self.start_timeout
+        while not self.endpoint_alive():
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Chrome did not open debug port {self.port} in {self.start_timeout}s.")
+            time.sleep(0.25)
+
+    def attach(self):
+        # Selenium is only imported once a browser is actually needed.
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+
+        chrome_options = Options()
+        chrome_options.add_experimental_option("debuggerAddress", f"127.0.0.1:{self.port}")
+        self.driver = webdriver.Chrome(options=chrome_options)
+        self.attached_to = self.browser_id()
+
+    def start(self):
+        self.launch()
+        self.attach()
+
+    def driver_alive(self):
+        service = getattr(self.driver, "service", None)
+        process = getattr(service, "process", None)
+        return process is None or process.poll() is None
+
+    def is_healthy(self):
+        # Only the debug port's HTTP endpoint and the chromedriver process
+        # are looked at: no WebDriver command, so checking a session never
+        # queues up behind (or interleaves with) an upload using it.
+        if self.driver is None or not self.driver_alive():
+            return False
+        browser_id = self.browser_id()
+        return browser_id is not None and browser_id == self.attached_to
+
+    def close_driver(self):
+        self.tabs.invalidate()
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+        self.attached_to = None
+
+    def close(self):
+        self.close_driver()
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+        self.process = None
+
+    def recover(self):
+        # Reattach if Chrome is still up (the driver died, or Chrome was
+        # restarted under us); relaunch it if it is gone.
+        self.close_driver()
+        if not self.endpoint_alive():
+            self.close()
+            self.launch()
+        self.attach()
+
+class SessionPool:
+    # Leases sessions to upload jobs one at a time; a leased session is only
+    # ever touched by its holder. Each platform leases from its own sessions
+    # (see session_platforms). Each lease checks the session first and
+    # reattaches or relaunches it if Chrome or the driver has died.
+
+    def __init__(self, size, base_port, user_data_dir, profile_directory, log_callback, chrome_binary="",
+                 start_timeout=20):
+        self.log_callback = log_callback
+        self.sessions = [BrowserSession(index, base_port + index, session_user_data_dir(user_data_dir, index),
+                                        profile_directory, chrome_binary, start_timeout)
+                         for index in range(size)]
+        self.assign_platforms()
+
+    def assign_platforms(self, platforms=PLATFORMS):
+        # One idle queue per group of sessions serving the same platforms.
+        self.idle = {}  # platforms -> queue of idle sessions
+        self.home = []  # session index -> its idle queue
+        for session in self.sessions:
+            served = session_platforms(session.index, len(self.sessions), platforms)
+            self.home.append(self.idle.setdefault(served, queue.Queue()))
+        self.lanes = {platform: queue_ for served, queue_ in self.idle.items() for platform in served}
+
+    def sessions_for(self, platform):
+        return sum(1 for queue_ in self.home if queue_ is self.lanes[platform])
+
+    def start(self):
+        for session in self.sessions:
+            try:
+                session.start()
+                self.log_callback(f"🟢 Browser {session.name} ready "
+                                  f"({', '.join(session_platforms(session.index, len(self.sessions)))}).")
+            except Exception as e:
+                logging.error(f"Could not start browser {session.name}: {e}")
+                self.log_callback(f"⚠️ Could not start browser {session.name}, will retry on first use: {e}")
+            self.home[session.index].put(session)
+
+    def _ensure_healthy(self, session):
+        if session.is_healthy():
+            return
+        self.log_callback(f"🩺 Browser {session.name} is not responding, reconnecting...")
+        logging.warning(f"Recovering dead browser {session.name}")
+        session.recover()
+        self.log_callback(f"🟢 Browser {session.name} is back.")
+
+    @contextmanager
+    def lease(self, platform, timeout=None):
+        session = self.lanes[platform].get(timeout=timeout)
+        try:
+            try:
+                self._ensure_healthy(session)
+            except Exception as e:
+                logging.error(f"Could not recover browser {session.name}: {e}")
+                raise SessionLost(f"Browser {session.name} could not be recovered: {e}") from e
+            yield session
+        finally:
+            self.home[session.index].put(session)
+
+    def check_idle_sessions(self):
+        # Only looks at sessions nobody is using, so it never races an upload.
+        for idle in self.idle.values():
+            for _ in range(idle.qsize()):
+                try:
+                    session = idle.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    self._ensure_healthy(session)
+                except Exception as e:
+                    logging.error(f"Health check failed for browser {session.name}: {e}")
+                finally:
+                    idle.put(session)
+
+    def close(self):
+        for session in self.sessions:
+            session.close()
+
+class SessionSupervisor(threading.Thread):
+    # Replaces the old keep-alive ping: every `interval` seconds it repairs
+    # whichever sessions are idle. Busy sessions are left to their holder;
+    # the next lease repairs them and the worker replays its job.
+
+    def __init__(self, pool, stop_event, interval=30):
+        super().__init__(daemon=True)
+        self.pool = pool
+        self.stop_event = stop_event
+        self.interval = interval
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.pool.check_idle_sessions()
+            except Exception as e:
+                logging.error(f"Session supervisor error: {e}")
+
+
+def session_pool_from_settings(settings, log_callback):
+    return SessionPool(settings.chrome_sessions, settings.chrome_debug_port, settings.chrome_user_data_dir,
+                       settings.chrome_profile_directory, log_callback, settings.chrome_binary,
+                       settings.chrome_start_timeout)
+
+def session_from_settings(settings, platform=PLATFORMS[0]):
+    # The pool's first session for `platform`, on its own: the profile
+    # that is logged in there.
+    index = next(index for index in range(settings.chrome_sessions)
+                 if platform in session_platforms(index, settings.chrome_sessions))
+    return BrowserSession(index, settings.chrome_debug_port + index,
+                          session_user_data_dir(settings.chrome_user_data_dir, index),
+                          settings.chrome_profile_directory, settings.chrome_binary, settings.chrome_start_timeout)
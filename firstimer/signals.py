@@ -0,0 +1,47 @@
+import time
+
+# --- PAGE SIGNALS ---
+
+# The FB composer and the IG "Create" flow both live in a dialog.
+COMPOSER_CSS = 'div[role="dialog"]'
+
+# Resolves true once the composer has closed, or has gone `quietMs` without
+# nodes being added or removed inside it; false when `timeoutMs` runs out.
+# Only the composer is watched: the feed around it never stops changing.
+COMPOSER_SETTLE_SCRIPT = """
+const composerCss = arguments[0], quietMs = arguments[1], timeoutMs = arguments[2];
+const done = arguments[arguments.length - 1];
+const composer = document.querySelector(composerCss);
+if (!composer) return done(true);
+let finished = false, quietTimer = null;
+const finish = (ok) => {
+    if (finished) return;
+    finished = true;
+    inside.disconnect();
+    closed.disconnect();
+    clearTimeout(quietTimer);
+    clearTimeout(limitTimer);
+    done(ok);
+};
+const activity = () => {
+    clearTimeout(quietTimer);
+    quietTimer = setTimeout(finish, quietMs, true);
+};
+const inside = new MutationObserver(activity);
+inside.observe(composer, {subtree: true, childList: true});
+const closed = new MutationObserver(() => { if (!composer.isConnected) finish(true); });
+closed.observe(document.body, {subtree: true, childList: true});
+const limitTimer = setTimeout(finish, timeoutMs, false);
+activity();
+"""
+
+def wait_for_composer_settle(driver, quiet_ms=750, timeout=5):
+    driver.set_script_timeout(timeout + 5)
+    return bool(driver.execute_async_script(COMPOSER_SETTLE_SCRIPT, COMPOSER_CSS, quiet_ms, int(timeout * 1000)))
+
+def pace(since, minimum):
+    # Optional minimum pacing on top of a real signal: only sleeps for the
+    # part of `minimum` the wait itself hasn't already used up.
+    remaining = minimum - (time.monotonic() - since)
+    if remaining > 0:
+        time.sleep(remaining)
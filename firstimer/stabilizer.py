@@ -0,0 +1,97 @@
+import logging
+import os
+import threading
+import time
+
+from .metrics import Metrics
+
+# --- FILE STABILIZATION ---
+
+def can_open_exclusively(path):
+    # On Windows this fails while the capture tool still has the file open.
+    try:
+        with open(path, "rb+"):
+            return True
+    except OSError:
+        return False
+
+class FileStabilizer(threading.Thread):
+    # Sits between watchdog and the upload queue. Every created/modified/moved
+    # event for a path resets its debounce timer; the path is only handed on
+    # once the events stop, size and mtime hold still between two polls and
+    # the file can be opened for writing. A path is only given up on once it
+    # has been polled twice and then gone `timeout` seconds without changing,
+    # so time spent blocked in on_stable (a full queue) never counts against it.
+
+    def __init__(self, on_stable, stop_event, log_callback, debounce=1.5, poll_interval=0.5, timeout=120,
+                 metrics=None):
+        super().__init__(daemon=True)
+        self.metrics = metrics or Metrics()
+        self.on_stable = on_stable
+        self.stop_event = stop_event
+        self.log_callback = log_callback
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.pending = {}  # path -> {"first_seen", "last_event", "last_change", "polls", "stat"}
+
+    def touch(self, path):
+        # Returns True the first time a path is seen so callers log it once.
+        now = time.monotonic()
+        with self.lock:
+            entry = self.pending.get(path)
+            if entry is None:
+                self.pending[path] = {"first_seen": now, "last_event": now, "last_change": now, "polls": 0,
+                                      "stat": None}
+                return True
+            entry["last_event"] = now
+            entry["last_change"] = now
+            entry["stat"] = None
+            return False
+
+    def forget(self, path):
+        with self.lock:
+            return self.pending.pop(path, None) is not None
+
+    def _check(self, path, entry, now):
+        # Returns "stable", "waiting" or "gone".
+        if now - entry["last_event"] < self.debounce:
+            return "waiting"
+        entry["polls"] += 1
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return "gone"
+        except OSError:
+            return "waiting"
+        observed = (st.st_size, st.st_mtime_ns)
+        previous, entry["stat"] = entry["stat"], observed
+        if observed != previous:
+            entry["last_change"] = now
+            return "waiting"
+        if st.st_size == 0:
+            return "waiting"
+        return "stable" if can_open_exclusively(path) else "waiting"
+
+    def run(self):
+        while not self.stop_event.wait(self.poll_interval):
+            now = time.monotonic()
+            ready = []
+            with self.lock:
+                for path, entry in list(self.pending.items()):
+                    state = self._check(path, entry, now)
+                    if state == "stable":
+                        ready.append(path)
+                        del self.pending[path]
+                        self.metrics.record("stabilize", now - entry["first_seen"], path=path)
+                    elif state == "gone":
+                        del self.pending[path]
+                        self.metrics.record("stabilize", now - entry["first_seen"], "gone", path=path)
+                    elif entry["polls"] >= 2 and now - entry["last_change"] > self.timeout:
+                        del self.pending[path]
+                        self.metrics.record("stabilize", now - entry["first_seen"], "timeout", path=path)
+                        logging.warning(f"Screenshot never settled, skipping: {path}")
+                        self.log_callback(f"⚠️ Screenshot never finished writing, skipping: {path}")
+            for path in ready:
+                self.on_stable(path)
@@ -0,0 +1,69 @@
+import json
+import threading
+import time
+import urllib.request
+
+# --- TAB REGISTRY ---
+
+HANDLE_PREFIX = "CDwindow-"  # older chromedrivers prefix the target id
+
+def target_id(handle):
+    return handle[len(HANDLE_PREFIX):] if handle.startswith(HANDLE_PREFIX) else handle
+
+class TabRegistry:
+    # Knows which tab shows which site without touching the WebDriver: one
+    # GET of the debug port's /json/list returns every tab's id and URL at
+    # once, instead of a switch_to + current_url round trip per tab. The
+    # result is cached, kept current as we open/close tabs ourselves, and
+    # re-read when stale or when a cached tab turns out to be gone.
+
+    def __init__(self, port, max_age=30):
+        self.port = port
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.tabs = {}  # target id -> url
+        self.refreshed_at = None
+
+    def list_targets(self, timeout=2):
+        with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/json/list", timeout=timeout) as response:
+            targets = json.load(response)
+        return {target["id"]: target.get("url", "") for target in targets if target.get("type") == "page"}
+
+    def refresh(self):
+        tabs = self.list_targets()
+        with self.lock:
+            self.tabs = tabs
+            self.refreshed_at = time.monotonic()
+
+    def is_stale(self):
+        return self.refreshed_at is None or time.monotonic() - self.refreshed_at > self.max_age
+
+    def _lookup(self, domain):
+        with self.lock:
+            for tab_id, url in self.tabs.items():
+                if domain in url:
+                    return tab_id
+        return None
+
+    def find(self, domain):
+        if self.is_stale():
+            self.refresh()
+        tab_id = self._lookup(domain)
+        if tab_id is None and self.refreshed_at is not None and time.monotonic() - self.refreshed_at > 0.5:
+            # Miss on an older snapshot: the tab may have been opened by hand.
+            self.refresh()
+            tab_id = self._lookup(domain)
+        return tab_id
+
+    def opened(self, handle, url):
+        with self.lock:
+            self.tabs[target_id(handle)] = url
+
+    def closed(self, handle):
+        with self.lock:
+            self.tabs.pop(target_id(handle), None)
+
+    def invalidate(self):
+        with self.lock:
+            self.tabs = {}
+            self.refreshed_at = None
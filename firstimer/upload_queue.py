@@ -0,0 +1,248 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+# --- UPLOAD QUEUE ---
+
+PLATFORMS = ("facebook", "instagram")
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+UploadJob = namedtuple("UploadJob", ["id", "path", "content_hash", "attempts", "platform", "replays"])
+
+class UploadQueue:
+    # Jobs live in SQLite so anything still waiting survives a restart.
+    # Each screenshot fans out into one job per platform, and each job goes
+    # pending -> in_progress -> done on its own, or back to pending with a
+    # backoff delay on failure until max_attempts is reached ("failed").
+    # A job whose browser died is replayed without spending an attempt, up
+    # to max_replays times in a row, with the same kind of backoff.
+
+    def __init__(self, db_file, max_pending=25, max_attempts=5, retry_base_delay=30, retry_max_delay=900,
+                 max_replays=10):
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.max_replays = max_replays
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.db = sqlite3.connect(db_file, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                path TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                last_error TEXT
+            )""")
+        self._migrate()
+        self.db.execute("CREATE INDEX IF NOT EXISTS jobs_path ON jobs (path)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS jobs_hash ON jobs (content_hash)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (platform, status, next_attempt_at)")
+        # A job that was running when the app died never finished; run it again.
+        self.db.execute("UPDATE jobs SET status = 'pending' WHERE status = 'in_progress'")
+
+    def _migrate(self):
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            # v0 had one row per screenshot covering both platforms.
+            columns = [row[1] for row in self.db.execute("PRAGMA table_info(jobs)")]
+            if "platform" not in columns:
+                self.db.execute("ALTER TABLE jobs ADD COLUMN platform TEXT NOT NULL DEFAULT 'facebook'")
+                self.db.execute("""
+                    INSERT INTO jobs (path, content_hash, status, attempts, next_attempt_at,
+                                      created_at, updated_at, last_error, platform)
+                    SELECT path, content_hash, status, attempts, next_attempt_at,
+                           created_at, updated_at, last_error, 'instagram'
+                    FROM jobs WHERE platform = 'facebook'""")
+            self.db.execute("PRAGMA user_version = 1")
+        if version < 2:
+            self.db.execute("ALTER TABLE jobs ADD COLUMN replays INTEGER NOT NULL DEFAULT 0")
+            self.db.execute("PRAGMA user_version = 2")
+
+    def _active_count(self):
+        row = self.db.execute(
+            "SELECT COUNT(DISTINCT path) FROM jobs WHERE status IN ('pending', 'in_progress')").fetchone()
+        return row[0]
+
+    def active_count(self):
+        with self.lock:
+            return self._active_count()
+
+    def active_ids(self, platform):
+        with self.lock:
+            rows = self.db.execute("SELECT id FROM jobs WHERE platform = ? AND status IN ('pending', 'in_progress')",
+                                   (platform,)).fetchall()
+        return {row[0] for row in rows}
+
+    def is_settled(self, content_hash, platforms=PLATFORMS):
+        # True if every platform already has this content queued, running or
+        # posted, i.e. put() would have nothing to add.
+        with self.lock:
+            row = self.db.execute(f"""
+                SELECT COUNT(DISTINCT platform) FROM jobs
+                WHERE content_hash = ? AND status IN ('pending', 'in_progress', 'done')
+                  AND platform IN ({", ".join("?" * len(platforms))})""",
+                (content_hash, *platforms)).fetchone()
+        return row[0] == len(platforms)
+
+    def settled_hashes(self, content_hashes, platforms=PLATFORMS, chunk_size=500):
+        # is_settled() for many hashes in one query per chunk; returns the
+        # settled ones as a set.
+        content_hashes = list(content_hashes)
+        settled = set()
+        with self.lock:
+            for start in range(0, len(content_hashes), chunk_size):
+                chunk = content_hashes[start:start + chunk_size]
+                rows = self.db.execute(f"""
+                    SELECT content_hash FROM jobs
+                    WHERE content_hash IN ({", ".join("?" * len(chunk))})
+                      AND status IN ('pending', 'in_progress', 'done')
+                      AND platform IN ({", ".join("?" * len(platforms))})
+                    GROUP BY content_hash HAVING COUNT(DISTINCT platform) = ?""",
+                    (*chunk, *platforms, len(platforms))).fetchall()
+                settled.update(row[0] for row in rows)
+        return settled
+
+    def _is_duplicate(self, path, content_hash, platform):
+        # Same path still waiting (repeated watchdog events), or same content
+        # already queued or posted under any name.
+        row = self.db.execute("""
+            SELECT 1 FROM jobs
+            WHERE platform = ?
+              AND ((path = ? AND status IN ('pending', 'in_progress'))
+                   OR (content_hash = ? AND status IN ('pending', 'in_progress', 'done')))
+            LIMIT 1""", (platform, path, content_hash)).fetchone()
+        return row is not None
+
+    def put(self, path, stop_event=None, platforms=PLATFORMS, content_hash=None):
+        # Returns "queued", "duplicate" or "stopped". Blocks while the queue is
+        # full so a burst of captures can't pile up unbounded work.
+        if content_hash is None:
+            content_hash = file_sha256(path)
+        with self.changed:
+            while self._active_count() >= self.max_pending:
+                if stop_event is not None and stop_event.is_set():
+                    return "stopped"
+                self.changed.wait(1)
+            now = time.time()
+            queued = False
+            for platform in platforms:
+                if self._is_duplicate(path, content_hash, platform):
+                    continue
+                self.db.execute(
+                    "INSERT INTO jobs (path, content_hash, platform, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (path, content_hash, platform, now, now))
+                queued = True
+            if not queued:
+                return "duplicate"
+            self.changed.notify_all()
+            return "queued"
+
+    def claim_batch(self, platform, timeout=None, max_items=1, window=0):
+        # Claims up to max_items ready jobs for one platform, oldest first.
+        # With a window, waits until the oldest has been queued that long (or
+        # max_items are ready) so captures arriving close together go out as
+        # one post. Returns [] if nothing was ready before the timeout.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.changed:
+            while True:
+                now = time.time()
+                rows = self.db.execute("""
+                    SELECT id, path, content_hash, attempts, platform, replays, created_at FROM jobs
+                    WHERE platform = ? AND status = 'pending' AND next_attempt_at <= ?
+                    ORDER BY next_attempt_at, id LIMIT ?""", (platform, now, max_items)).fetchall()
+                window_left = window - (now - min(row[6] for row in rows)) if rows else None
+                if rows and (len(rows) >= max_items or window_left <= 0):
+                    self.db.executemany("UPDATE jobs SET status = 'in_progress', updated_at = ? WHERE id = ?",
+                                        [(now, row[0]) for row in rows])
+                    return [UploadJob(*row[:6]) for row in rows]
+
+                wait_for = window_left
+                if wait_for is None:
+                    upcoming = self.db.execute(
+                        "SELECT MIN(next_attempt_at) FROM jobs WHERE platform = ? AND status = 'pending'",
+                        (platform,)).fetchone()[0]
+                    if upcoming is not None:
+                        wait_for = max(0.0, upcoming - now)
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return []
+                    wait_for = remaining if wait_for is None else min(wait_for, remaining)
+                self.changed.wait(wait_for)
+
+    def complete(self, job):
+        # Returns True once every platform job for this screenshot is done.
+        with self.changed:
+            self.db.execute("UPDATE jobs SET status = 'done', updated_at = ?, last_error = NULL WHERE id = ?",
+                            (time.time(), job.id))
+            self.changed.notify_all()
+            done, total = self.db.execute("""
+                SELECT COUNT(DISTINCT CASE WHEN status = 'done' THEN platform END), COUNT(DISTINCT platform)
+                FROM jobs WHERE content_hash = ?""", (job.content_hash,)).fetchone()
+            return done == total
+
+    def status(self, content_hash):
+        # Latest status per platform for one screenshot, e.g. {"facebook": "done"}.
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT platform, status FROM jobs WHERE content_hash = ? ORDER BY id",
+                (content_hash,)).fetchall()
+        return dict(rows)
+
+    def fail(self, job, error, retry=True):
+        # Returns the delay before the next attempt, or None if the job gave up.
+        attempts = job.attempts + 1
+        now = time.time()
+        with self.changed:
+            if retry and attempts < self.max_attempts:
+                delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempts - 1))
+                self.db.execute("""
+                    UPDATE jobs SET status = 'pending', attempts = ?, replays = 0, next_attempt_at = ?,
+                                    updated_at = ?, last_error = ?
+                    WHERE id = ?""", (attempts, now + delay, now, error, job.id))
+            else:
+                delay = None
+                self.db.execute("""
+                    UPDATE jobs SET status = 'failed', attempts = ?, updated_at = ?, last_error = ?
+                    WHERE id = ?""", (attempts, now, error, job.id))
+            self.changed.notify_all()
+        return delay
+
+    def release(self, job, error, base_delay=5):
+        # Puts a job back without using up an attempt, for failures that were
+        # the browser's fault rather than the job's. Returns the delay, which
+        # doubles with each replay in a row so a Chrome that can't start
+        # doesn't spin the queue.
+        delay = min(self.retry_max_delay, base_delay * 2 ** job.replays)
+        now = time.time()
+        with self.changed:
+            self.db.execute("""
+                UPDATE jobs SET status = 'pending', replays = ?, next_attempt_at = ?, updated_at = ?,
+                                last_error = ?
+                WHERE id = ?""", (job.replays + 1, now + delay, now, error, job.id))
+            self.changed.notify_all()
+        return delay
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def upload_queue_from_settings(settings):
+    return UploadQueue(settings.queue_db_file, settings.queue_max_pending, settings.queue_max_attempts,
+                       settings.queue_retry_base_delay, settings.queue_retry_max_delay, settings.queue_max_replays)
@@ -0,0 +1,205 @@
+import logging
+import time
+import traceback
+
+from selenium.common.exceptions import NoSuchWindowException, StaleElementReferenceException
+
+from .actions import PageActions, load_selectors
+from .captions import caption_engine
+from .counters import POST_COUNTERS
+from .metrics import Metrics
+from .signals import pace, wait_for_composer_settle
+from .tabs import HANDLE_PREFIX
+
+# --- UPLOADER ---
+
+def insert_text(driver, element, text):
+    # Puts the whole caption in with one command instead of one WebDriver
+    # keystroke per character: CDP Input.insertText into the focused element,
+    # then execCommand("insertText"), then plain typing as a last resort.
+    driver.execute_script("arguments[0].focus();", element)
+    try:
+        driver.execute_cdp_cmd("Input.insertText", {"text": text})
+        return
+    except Exception:
+        pass
+    inserted = driver.execute_script(
+        "arguments[0].focus(); return document.execCommand('insertText', false, arguments[1]);", element, text)
+    if not inserted:
+        element.send_keys(text)
+
+def file_input_value(paths):
+    # One path, or several for a multi-photo post / carousel: a multiple file
+    # input takes them newline-separated in a single send_keys.
+    return paths if isinstance(paths, str) else "\n".join(paths)
+
+class ScreenshotUploader:
+    def __init__(self, session, log_callback, settings, counters, metrics=None):
+        self.driver = session.driver
+        self.metrics = metrics or Metrics()
+        self.tabs = session.tabs
+        self.log_callback = log_callback
+        self.settings = settings
+        self.counters = counters
+        self.actions = PageActions(self.driver, load_selectors(settings.selector_file), log_callback,
+                                   settings.signal_timeout, settings.action_settle_ms, self.metrics)
+
+    def caption(self, counter, suffix=""):
+        settings = self.settings
+        engine = caption_engine(settings.fb_caption_template, settings.caption_max_length,
+                                settings.caption_overflow, suffix)
+        return engine.render(counter)
+
+    def upload(self, platform, screenshot_paths, counter_key=None):
+        # counter_key names the post for its number reservation (the pipeline
+        # passes its job ids); by default it's the files being posted.
+        counter_key = counter_key or file_input_value(screenshot_paths)
+        if platform == "facebook":
+            succeeded = self.upload_to_facebook(screenshot_paths, counter_key)
+            minimum_pacing = self.settings.wait_seconds
+        else:
+            succeeded = self.upload_to_instagram(screenshot_paths, counter_key)
+            minimum_pacing = self.settings.delay_after_ig
+        # The post number is only spent once the post is up.
+        if succeeded:
+            self.counters.commit(POST_COUNTERS[platform], counter_key)
+        else:
+            self.counters.release(POST_COUNTERS[platform], counter_key)
+        if succeeded:
+            # Let the composer close or settle before this session takes the
+            # next job. The post is already up: nothing here may turn it into
+            # a retry, and it never waits longer than settle_timeout.
+            settle_started = time.monotonic()
+            try:
+                with self.metrics.span(f"settle:{platform}"):
+                    settled = wait_for_composer_settle(self.driver, self.settings.page_quiet_ms,
+                                                       self.settings.settle_timeout)
+                if not settled:
+                    self.log_callback(f"⚠️ {platform} composer still busy after "
+                                      f"{self.settings.settle_timeout}s, moving on.")
+            except Exception as e:
+                logging.warning(f"Settling the {platform} page after a post failed: {e}")
+                self.log_callback(f"⚠️ Could not wait for the {platform} page to settle, moving on: {e}")
+            pace(settle_started, minimum_pacing)
+        return succeeded
+
+    def switch_to_tab(self, domain, url):
+        with self.metrics.span(f"tab:{domain}"):
+            self._switch_to_tab(domain, url)
+
+    def _switch_to_tab(self, domain, url):
+        driver = self.driver
+        try:
+            tab_id = self.tabs.find(domain)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not list tabs on port {self.tabs.port}: {e}")
+            self.tabs.invalidate()
+            tab_id = None
+        if tab_id is not None:
+            if self.switch_to_target(tab_id):
+                self.log_callback(f"🔄 Switched to existing {domain} tab.")
+                return
+            self.tabs.closed(tab_id)
+        self.log_callback(f"🌍 No existing {domain} tab found. Opening one...")
+        driver.execute_script("window.open(arguments[0], '_blank');", url)
+        handle = driver.window_handles[-1]
+        driver.switch_to.window(handle)
+        self.tabs.opened(handle, url)
+
+    def switch_to_target(self, tab_id):
+        # Window handles are the CDP target ids, with a "CDwindow-" prefix
+        # on older chromedrivers.
+        for handle in (tab_id, HANDLE_PREFIX + tab_id):
+            try:
+                self.driver.switch_to.window(handle)
+                return True
+            except NoSuchWindowException:
+                continue
+        return False
+
+    def switch_to_instagram_tab(self):
+        self.log_callback("🔎 Searching for existing Instagram tab...")
+        self.switch_to_tab("instagram.com", "https://www.instagram.com/")
+
+    def upload_to_facebook(self, screenshot_paths, counter_key):
+        driver = self.driver
+        try:
+            self.log_callback("🔎 Searching for existing Facebook tab...")
+            self.switch_to_tab("facebook.com", "https://www.facebook.com/")
+
+            self.log_callback("⏳ Opening the post composer...")
+            found = self.actions.run(("click", "fb.composer_open"), ("present", "fb.composer_text"),
+                                     ("click", "fb.photo_video"), ("present", "fb.file_input"))
+            with self.metrics.span("send_file:facebook"):
+                found["fb.file_input"].send_keys(file_input_value(screenshot_paths))
+
+            self.log_callback("✍️ Writing caption...")
+            post_number = self.counters.reserve(POST_COUNTERS["facebook"], counter_key)
+            with self.metrics.span("caption:facebook"):
+                insert_text(driver, found["fb.composer_text"], self.caption(post_number))
+
+            # FB keeps the Post button disabled until the photo has uploaded
+            self.log_callback("⏳ Waiting for Post button...")
+            self.actions.run(("clickable", "fb.post"))
+            # --- DO NOT POST --- (commented as requested)
+            # self.actions.run(("click", "fb.post"))
+
+            success_message = f"✅ Screenshot posted successfully (not really, post click commented): {screenshot_paths}"
+            logging.info(success_message)
+            self.log_callback(success_message)
+            return True
+        except Exception:
+            error_message = f"❌ Failed to upload screenshot to Facebook:\n{traceback.format_exc()}"
+            logging.error(error_message)
+            self.log_callback(error_message)
+            return False
+
+    def upload_to_instagram(self, image_paths, counter_key):
+        try:
+            driver = self.driver
+            self.switch_to_instagram_tab()
+            self.log_callback("⏳ Opening the new post dialog...")
+            found = self.actions.run(("click", "ig.create"), ("click", "ig.post_option"),
+                                     ("click", "ig.select_from_computer"), ("present", "ig.file_input"))
+            with self.metrics.span("send_file:instagram"):
+                found["ig.file_input"].send_keys(file_input_value(image_paths))
+            self.log_callback(f"🖼️ Image selected for upload: {image_paths}")
+
+            self.log_callback("⏳ Clicking through to the caption box...")
+            caption_box = self.actions.run(("click", "ig.next"), ("click", "ig.next"),
+                                           ("visible", "ig.caption"))["ig.caption"]
+            tries = 0
+            while tries < 3:
+                try:
+                    caption_box.click()
+                    ig_post_number = self.counters.reserve(POST_COUNTERS["instagram"], counter_key)
+                    full_caption = self.caption(ig_post_number, f" {self.settings.ig_caption_hashtags}")
+                    with self.metrics.span("caption:instagram"):
+                        insert_text(driver, caption_box, full_caption)
+                    self.log_callback("✅ Caption entered.")
+                    break
+                except StaleElementReferenceException:
+                    self.log_callback("[IG] Caption box went stale, retrying...")
+                    tries += 1
+                    time.sleep(1)
+                    caption_box = self.actions.run(("visible", "ig.caption"))["ig.caption"]
+            else:
+                self.log_callback("[IG] Failed to enter caption after 3 tries.")
+                self.tabs.closed(driver.current_window_handle)
+                driver.close()
+                driver.switch_to.window(driver.window_handles[0])
+                return False
+
+            self.log_callback("⏳ Waiting for 'Share' button...")
+            # --- DO NOT SHARE --- (commented)
+            # self.actions.run(("click", "ig.share"), ("present", "ig.shared"))
+            self.log_callback("🚦 Share button is ready (click is commented out).")
+
+            self.log_callback("✅ Instagram (simulated) upload complete.")
+            return True
+
+        except Exception:
+            error_message = f"❌ Failed Instagram upload:\n{traceback.format_exc()}"
+            logging.error(error_message)
+            self.log_callback(error_message)
+            return False
@@ -0,0 +1,87 @@
+import logging
+import os
+import time
+
+from watchdog.events import FileSystemEventHandler
+
+from .imaging import dhash
+from .metrics import Metrics
+from .stabilizer import FileStabilizer
+from .upload_queue import PLATFORMS, file_sha256
+
+# --- WATCHER ---
+
+def is_screenshot(path):
+    return path.lower().endswith(('.png', '.jpg', '.jpeg'))
+
+class ScreenshotHandler(FileSystemEventHandler):
+    def __init__(self, upload_queue, log_callback, stop_event, preprocessor=None, perceptual_index=None,
+                 debounce=1.5, poll_interval=0.5, stabilize_timeout=120, metrics=None, platforms=PLATFORMS):
+        self.upload_queue = upload_queue
+        # The platforms this folder feeds.
+        self.platforms = platforms
+        self.metrics = metrics or Metrics()
+        self.log_callback = log_callback
+        self.stop_event = stop_event
+        self.preprocessor = preprocessor
+        self.perceptual_index = perceptual_index
+        self.stabilizer = FileStabilizer(self.enqueue, stop_event, log_callback, debounce, poll_interval,
+                                         stabilize_timeout, self.metrics)
+        self.stabilizer.start()
+
+    def _track(self, path):
+        if is_screenshot(path) and self.stabilizer.touch(path):
+            self.log_callback(f"📸 New screenshot detected: {path}")
+            # How far behind the capture tool's first write the event arrived.
+            try:
+                self.metrics.record("detect", max(0.0, time.time() - os.path.getmtime(path)), path=path)
+            except OSError:
+                pass
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self._track(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._track(event.src_path)
+
+    def on_moved(self, event):
+        # Rename-after-write: the temp name never becomes a job of its own.
+        if not event.is_directory:
+            self.stabilizer.forget(event.src_path)
+            self._track(event.dest_path)
+
+    def enqueue(self, path, content_hash=None):
+        # Returns "queued", "duplicate", "near_duplicate", "stopped" or "unreadable".
+        with self.metrics.span("enqueue", path=path):
+            return self._enqueue(path, content_hash)
+
+    def _enqueue(self, path, content_hash=None):
+        try:
+            if content_hash is None:
+                content_hash = file_sha256(path)
+            perceptual_hash = None
+            if self.perceptual_index is not None:
+                perceptual_hash = dhash(path)
+                match = self.perceptual_index.find_similar(perceptual_hash, path, content_hash)
+                if match is not None:
+                    original, distance = match
+                    logging.info(f"Skipping near-duplicate {path} (distance {distance} from {original})")
+                    self.log_callback(f"🪞 Near-duplicate of {os.path.basename(original)}, skipping: {path}")
+                    return "near_duplicate"
+            result = self.upload_queue.put(path, self.stop_event, self.platforms, content_hash)
+        except OSError as e:
+            logging.warning(f"Could not read screenshot {path}: {e}")
+            self.log_callback(f"⚠️ Could not read screenshot: {e}")
+            return "unreadable"
+        if result == "duplicate":
+            self.log_callback(f"♻️ Already queued or posted, skipping: {path}")
+        elif result == "queued":
+            self.log_callback(f"📥 Queued for upload: {path}")
+            if perceptual_hash is not None:
+                self.perceptual_index.add(perceptual_hash, path, content_hash)
+            if self.preprocessor is not None:
+                # Start resizing now so it's ready by the time a worker claims it.
+                self.preprocessor.prefetch(path, content_hash, self.platforms)
+        return result
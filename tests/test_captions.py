@@ -0,0 +1,54 @@
+import pytest
+
+from firstimer.captions import CaptionEngine, generate_caption
+
+
+def test_matches_the_plain_formatter_when_there_is_room():
+    template = "Y{yo}, another fake win ra9m: {counter}"
+    assert CaptionEngine(template, 2200).render(7) == generate_caption(template, 7)
+
+
+def test_cap_yo_shortens_the_run_of_os_to_fit():
+    caption = CaptionEngine("Y{yo} #{counter}", max_length=20).render(100)
+    assert caption == "Y" + "o" * 14 + " #100"
+    assert len(caption) == 20
+
+
+def test_cap_yo_splits_the_room_between_several_yo_fields():
+    caption = CaptionEngine("{yo}|{yo}", max_length=11).render(50)
+    assert caption == "o" * 5 + "|" + "o" * 5
+
+
+def test_truncate_cuts_and_ellipsizes():
+    caption = CaptionEngine("Y{yo}", max_length=10, overflow="truncate").render(50)
+    assert caption == "Y" + "o" * 8 + "…"
+
+
+def test_suffix_is_appended_as_literal_text():
+    engine = CaptionEngine("Y{yo}", max_length=100, suffix=" #tag{s} {counter}")
+    assert engine.render(2) == "Yoo #tag{s} {counter}"
+
+
+def test_suffix_counts_towards_the_limit():
+    caption = CaptionEngine("Y{yo}", max_length=10, suffix=" #gg").render(50)
+    assert caption == "Y" + "o" * 5 + " #gg"
+
+
+def test_escaped_braces_in_the_template_render_as_braces():
+    assert CaptionEngine("{{win}} {counter}", 100).render(3) == "{win} 3"
+
+
+@pytest.mark.parametrize("template", ["{count}", "{yo", "{0}"])
+def test_bad_templates_are_rejected_up_front(template):
+    with pytest.raises(ValueError):
+        CaptionEngine(template)
+
+
+def test_unknown_overflow_policy_is_rejected():
+    with pytest.raises(ValueError):
+        CaptionEngine("{yo}", overflow="wrap")
+
+
+def test_max_length_below_one_is_rejected():
+    with pytest.raises(ValueError):
+        CaptionEngine("{yo}", max_length=0)
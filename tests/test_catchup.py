@@ -0,0 +1,128 @@
+import os
+import random
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("watchdog")
+Image = pytest.importorskip("PIL.Image")
+
+from firstimer.catchup import CatchUpScanner, ScanManifest
+from firstimer.imaging import PerceptualIndex
+from firstimer.upload_queue import UploadQueue
+from firstimer.watcher import ScreenshotHandler
+
+
+def make_screenshot(path, seed, age, tweak=False):
+    rng = random.Random(seed)
+    image = Image.new("L", (90, 80))
+    image.putdata([rng.randrange(256) for _ in range(90 * 80)])
+    if tweak:
+        image.putpixel((0, 0), (image.getpixel((0, 0)) + 1) % 256)  # same picture, different bytes
+    image.save(path)
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+    return str(path)
+
+
+class App:
+    # The parts of a Pipeline that catch-up touches, reopened per launch.
+
+    def __init__(self, tmp_path, phash_window=600):
+        self.stop_event = threading.Event()
+        self.folder = str(tmp_path / "shots")
+        os.makedirs(self.folder, exist_ok=True)
+        self.upload_queue = UploadQueue(str(tmp_path / "upload_queue.db"), max_pending=100)
+        self.index = PerceptualIndex(str(tmp_path / "state.db"), window=phash_window)
+        self.manifest = ScanManifest(str(tmp_path / "state.db"))
+        self.handler = ScreenshotHandler(self.upload_queue, lambda message: None, self.stop_event,
+                                         perceptual_index=self.index, platforms=("facebook",))
+        self.enqueued = []
+        handler_enqueue = self.handler.enqueue
+
+        def enqueue(path, content_hash=None):
+            self.enqueued.append(path)
+            return handler_enqueue(path, content_hash)
+
+        self.handler.enqueue = enqueue
+
+    def catch_up(self):
+        CatchUpScanner(self.folder, self.handler, self.upload_queue, self.manifest, self.stop_event,
+                       lambda message: None, rate=0, min_age=10, headroom=0).run()
+        return [os.path.basename(path) for path in self.enqueued]
+
+    def close(self):
+        self.stop_event.set()
+        self.handler.stabilizer.join(timeout=2)
+        for component in (self.upload_queue, self.index, self.manifest):
+            component.close()
+
+
+@pytest.fixture
+def launch(tmp_path):
+    apps = []
+
+    def start(**options):
+        if apps:
+            apps[-1].close()
+        apps.append(App(tmp_path, **options))
+        return apps[-1]
+
+    yield start
+    apps[-1].close()
+
+
+def test_leftovers_are_queued_oldest_first_and_fresh_files_left_to_the_watcher(launch):
+    app = launch()
+    make_screenshot(os.path.join(app.folder, "b.png"), 1, age=60)
+    make_screenshot(os.path.join(app.folder, "a.png"), 2, age=120)
+    make_screenshot(os.path.join(app.folder, "fresh.png"), 3, age=0)
+    with open(os.path.join(app.folder, "notes.txt"), "w") as f:
+        f.write("not a screenshot")
+    assert app.catch_up() == ["a.png", "b.png"]
+    assert app.upload_queue.active_count() == 2
+
+
+def test_files_already_queued_or_posted_are_not_enqueued_again(launch):
+    app = launch()
+    make_screenshot(os.path.join(app.folder, "a.png"), 1, age=60)
+    assert app.catch_up() == ["a.png"]
+    assert launch().catch_up() == []
+
+
+def test_a_failed_upload_is_retried_on_the_next_launch(launch):
+    app = launch()
+    make_screenshot(os.path.join(app.folder, "a.png"), 1, age=60)
+    app.catch_up()
+    job = app.upload_queue.claim_batch("facebook", timeout=0)[0]
+    app.upload_queue.fail(job, "boom", retry=False)
+
+    # Still inside the near-duplicate window: the file must not match itself.
+    app = launch()
+    assert app.catch_up() == ["a.png"]
+    assert app.upload_queue.status(job.content_hash) == {"facebook": "pending"}
+
+
+def test_near_duplicates_are_skipped_but_looked_at_again_later(launch):
+    app = launch(phash_window=600)
+    make_screenshot(os.path.join(app.folder, "a.png"), 1, age=120)
+    make_screenshot(os.path.join(app.folder, "a-again.png"), 1, age=60, tweak=True)
+    app.catch_up()
+    assert app.upload_queue.active_count() == 1
+
+    app = launch(phash_window=0.01)  # the original has left the window
+    time.sleep(0.05)
+    assert app.catch_up() == ["a-again.png"]
+    assert app.upload_queue.active_count() == 2
+
+
+def test_deleted_files_are_forgotten(launch):
+    app = launch()
+    path = make_screenshot(os.path.join(app.folder, "a.png"), 1, age=60)
+    app.catch_up()
+    assert list(app.manifest.load()) == [path]
+    os.remove(path)
+    app = launch()
+    app.catch_up()
+    assert app.manifest.load() == {}
@@ -0,0 +1,155 @@
+import dataclasses
+import json
+import os
+
+import pytest
+
+from firstimer.cli import main
+from firstimer.config import DEFAULT_CONFIG, ConfigError, ConfigStore, load_settings, parse_settings, save_config
+
+
+def write_config(path, config):
+    path.write_text(json.dumps(config))
+    return str(path)
+
+
+def bump_mtime(path):
+    # Some filesystems only keep whole seconds.
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+
+
+def test_defaults_parse():
+    settings = parse_settings(dict(DEFAULT_CONFIG))
+    assert settings.chrome_sessions == 2
+    assert settings.wait_seconds == 0.0
+
+
+def test_settings_are_immutable():
+    settings = parse_settings({})
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        settings.wait_seconds = 5
+
+
+def test_shipped_config_keys_are_honoured():
+    settings = parse_settings({"fb_watch_folder": "fb", "ig_watch_folder": "ig", "wait_seconds": 10,
+                               "fb_counter_file": "counter.txt", "ig_counter": 4, "chrome_user_data_dir": "",
+                               "prompt_fb": False, "prompt_ig": False})
+    assert settings.wait_seconds == 10.0
+    assert settings.fb_counter_file == "counter.txt"
+    assert settings.ig_counter == 4
+    assert settings.chrome_user_data_dir == ""  # Chrome starts without --user-data-dir
+    assert settings.watch_roots() == {"fb": ("facebook",), "ig": ("instagram",)}
+
+
+def test_legacy_upper_case_keys_are_aliases():
+    settings = parse_settings({"SCREENSHOT_DIRECTORY": "shots", "DELAY_FB_TO_IG": 3, "QUEUE_MAX_PENDING": 7})
+    assert settings.watch_roots() == {"shots": ("facebook", "instagram")}
+    assert settings.wait_seconds == 3.0
+    assert settings.queue_max_pending == 7
+
+
+def test_lower_case_key_wins_over_its_legacy_spelling():
+    assert parse_settings({"wait_seconds": 1, "DELAY_FB_TO_IG": 9}).wait_seconds == 1.0
+
+
+def test_one_watch_folder_feeds_both_platforms():
+    settings = parse_settings({"fb_watch_folder": "shots", "ig_watch_folder": ""})
+    assert settings.watch_roots() == {"shots": ("facebook", "instagram")}
+
+
+def test_every_problem_is_reported_at_once():
+    with pytest.raises(ConfigError) as error:
+        parse_settings({"wait_seconds": "soon", "chrome_sessions": 0, "caption_overflow": "wrap",
+                        "phash_enabled": "yes", "queue_max_attempts": 2.5})
+    message = str(error.value)
+    for name in ("wait_seconds", "chrome_sessions", "caption_overflow", "phash_enabled", "queue_max_attempts"):
+        assert name in message
+
+
+@pytest.mark.parametrize("name, value", [
+    ("stabilize_poll_interval", 0),
+    ("log_flush_ms", 0),
+    ("metrics_export_interval", 0),
+    ("session_health_interval", 0),
+    ("signal_timeout", 0),
+    ("chrome_debug_port", 99999),
+    ("batch_max_items", 11),
+])
+def test_out_of_range_values_are_rejected(name, value):
+    with pytest.raises(ConfigError, match=name):
+        parse_settings({name: value})
+
+
+@pytest.mark.parametrize("name", ["config_reload_interval", "catchup_rate_per_minute"])
+def test_zero_turns_some_settings_off(name):
+    assert getattr(parse_settings({name: 0}), name) == 0
+
+
+def test_bad_caption_template_is_rejected():
+    with pytest.raises(ConfigError, match="fb_caption_template"):
+        parse_settings({"fb_caption_template": "Win #{count}"})
+
+
+def test_missing_file_is_created_with_defaults(tmp_path):
+    config_file = str(tmp_path / "config.json")
+    settings = load_settings(config_file)
+    assert settings.config_file == config_file
+    with open(config_file) as f:
+        assert json.load(f) == DEFAULT_CONFIG
+
+
+def test_store_reloads_only_when_the_file_changes(tmp_path):
+    config_file = write_config(tmp_path / "config.json", {"wait_seconds": 1})
+    store = ConfigStore(config_file)
+    before = store.current()
+    assert store.reload_if_changed() == []
+
+    save_config({"wait_seconds": 2, "chrome_sessions": 3}, config_file)
+    bump_mtime(config_file)
+    assert sorted(store.reload_if_changed()) == ["chrome_sessions", "wait_seconds"]
+    assert store.current().wait_seconds == 2.0
+    assert before.wait_seconds == 1.0  # a snapshot already handed out never changes
+
+
+def test_store_keeps_the_previous_snapshot_on_a_bad_edit(tmp_path):
+    config_file = write_config(tmp_path / "config.json", {"wait_seconds": 1})
+    store = ConfigStore(config_file)
+
+    with open(config_file, "w") as f:
+        f.write("{not json")
+    bump_mtime(config_file)
+    with pytest.raises(ConfigError):
+        store.reload_if_changed()
+    assert store.current().wait_seconds == 1.0
+
+    save_config({"fb_caption_template": "{nope}"}, config_file)
+    bump_mtime(config_file)
+    with pytest.raises(ConfigError):
+        store.reload_if_changed()
+    assert store.current().wait_seconds == 1.0
+    assert store.reload_if_changed() == []  # not re-parsed until it changes again
+
+
+def test_store_starts_from_the_file_as_it_is_now(tmp_path):
+    config_file = write_config(tmp_path / "config.json", {"wait_seconds": 1})
+    launched_with = load_settings(config_file)
+    save_config({"wait_seconds": 5}, config_file)  # edited before Start was pressed
+    store = ConfigStore(launched_with.config_file)
+    assert store.current().wait_seconds == 5.0
+    assert store.reload_if_changed() == []
+
+
+def test_invalid_json_names_the_file(tmp_path):
+    config_file = tmp_path / "config.json"
+    config_file.write_text("{not json")
+    with pytest.raises(ConfigError, match="config.json is not valid JSON"):
+        load_settings(str(config_file))
+
+
+@pytest.mark.parametrize("content", ["{not json", '{"wait_seconds": -1}'])
+def test_cli_reports_a_bad_config_without_a_traceback(tmp_path, capsys, content):
+    config_file = tmp_path / "config.json"
+    config_file.write_text(content)
+    assert main(["watch", "--config", str(config_file)]) == 2
+    assert "config.json" in capsys.readouterr().err
@@ -0,0 +1,70 @@
+from collections import namedtuple
+
+import pytest
+
+from firstimer.counters import CounterStore, jobs_key
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    return str(tmp_path / "state.db")
+
+
+@pytest.fixture
+def counters(db_file):
+    store = CounterStore(db_file, {"fb_post": lambda: 41})
+    yield store
+    store.close()
+
+
+def test_first_run_carries_on_from_the_seed(counters):
+    assert counters.reserve("fb_post", "1") == 42
+    assert counters.reserve("ig_post", "1") == 1  # no seed: starts from 0
+
+
+def test_the_seed_is_only_used_once(db_file):
+    CounterStore(db_file, {"fb_post": lambda: 41}).close()
+    store = CounterStore(db_file, {"fb_post": lambda: 1000})
+    assert store.reserve("fb_post", "1") == 42
+    store.close()
+
+
+def test_a_retry_of_the_same_post_gets_the_same_number(counters):
+    assert counters.reserve("fb_post", "1") == 42
+    assert counters.reserve("fb_post", "2") == 43
+    assert counters.reserve("fb_post", "1") == 42
+
+
+def test_committed_numbers_are_never_handed_out_again(counters):
+    assert counters.reserve("fb_post", "1") == 42
+    counters.commit("fb_post", "1")
+    assert counters.reserve("fb_post", "1") == 43  # a new post with a reused key
+
+
+def test_released_numbers_go_to_the_next_post(counters):
+    assert counters.reserve("fb_post", "1") == 42
+    assert counters.reserve("fb_post", "2") == 43
+    counters.release("fb_post", "1")
+    assert counters.reserve("fb_post", "3") == 42
+    assert counters.reserve("fb_post", "4") == 44
+
+
+def test_reservations_survive_a_restart(db_file):
+    store = CounterStore(db_file, {})
+    assert store.reserve("fb_post", "1") == 1
+    store.close()
+    store = CounterStore(db_file, {})
+    assert store.reserve("fb_post", "1") == 1
+    assert store.reserve("fb_post", "2") == 2
+    store.close()
+
+
+def test_orphaned_reservations_are_freed(counters):
+    Job = namedtuple("Job", ["id"])
+    assert counters.reserve("fb_post", jobs_key([Job(1), Job(2)])) == 42  # both jobs still queued
+    assert counters.reserve("fb_post", jobs_key([Job(3)])) == 43  # job dropped since
+    assert counters.reserve("fb_post", jobs_key([Job(4), Job(5)])) == 44  # job 5 dropped since
+    assert counters.reserve("fb_post", "screenshot.png") == 45  # not a pipeline post
+    assert counters.release_orphans("fb_post", {1, 2, 4}) == 3
+    assert counters.reserve("fb_post", "1,2") == 42
+    assert [counters.reserve("fb_post", key) for key in ("a", "b", "c", "d")] == [43, 44, 45, 46]
@@ -0,0 +1,89 @@
+import random
+import time
+
+from firstimer.imaging import BKTree, PerceptualIndex, hamming
+
+
+def flip(value, bits):
+    for bit in bits:
+        value ^= 1 << bit
+    return value
+
+
+def test_hamming():
+    assert hamming(0b1011, 0b0001) == 2
+    assert hamming(0, (1 << 64) - 1) == 64
+
+
+def test_bktree_finds_everything_within_the_distance():
+    rng = random.Random(1)
+    values = [rng.getrandbits(64) for _ in range(2000)]
+    tree = BKTree()
+    for index, value in enumerate(values):
+        tree.add(value, index)
+    query = flip(values[0], (3, 17, 40))
+    for max_distance in (0, 3, 6, 12):
+        expected = sorted((hamming(query, value), index) for index, value in enumerate(values)
+                          if hamming(query, value) <= max_distance)
+        assert sorted(tree.search(query, max_distance)) == expected
+
+
+def test_bktree_keeps_every_item_with_the_same_hash():
+    tree = BKTree()
+    tree.add(42, "a")
+    tree.add(42, "b")
+    assert sorted(tree.search(42, 0)) == [(0, "a"), (0, "b")]
+
+
+def test_empty_bktree():
+    assert BKTree().search(1, 64) == []
+
+
+def test_index_finds_the_closest_recent_match(tmp_path):
+    index = PerceptualIndex(str(tmp_path / "state.db"), max_distance=6, window=600)
+    value = random.Random(2).getrandbits(64)
+    index.add(value, "first.png")
+    index.add(flip(value, (1,)), "second.png")
+    assert index.find_similar(flip(value, (1, 2))) == ("second.png", 1)
+    assert index.find_similar(flip(value, range(20))) is None
+    index.close()
+
+
+def test_a_file_is_not_a_near_duplicate_of_itself(tmp_path):
+    index = PerceptualIndex(str(tmp_path / "state.db"), max_distance=6, window=600)
+    index.add(123456789, "a.png", "hash-a")
+    assert index.find_similar(123456789, "a.png", "hash-b") is None  # same file, edited
+    assert index.find_similar(123456789, "copy.png", "hash-a") is None  # same content, new name
+    assert index.find_similar(123456789, "b.png", "hash-b") == ("a.png", 0)
+    index.close()
+
+
+def test_index_ignores_matches_outside_the_window(tmp_path):
+    index = PerceptualIndex(str(tmp_path / "state.db"), max_distance=6, window=0.05)
+    index.add(123456789, "old.png")
+    time.sleep(0.1)
+    assert index.find_similar(123456789) is None
+    assert len(index.recent) == 0
+    index.close()
+
+
+def test_index_survives_a_restart(tmp_path):
+    db_file = str(tmp_path / "state.db")
+    value = (1 << 63) | 12345  # stored signed in SQLite
+    index = PerceptualIndex(db_file)
+    index.add(value, "a.png")
+    index.close()
+
+    index = PerceptualIndex(db_file)
+    assert index.find_similar(value) == ("a.png", 0)
+    index.close()
+
+
+def test_index_rebuilds_the_tree_as_hashes_expire(tmp_path):
+    index = PerceptualIndex(str(tmp_path / "state.db"), max_distance=0, window=600)
+    for n in range(10):
+        index.add(n, f"{n}.png")
+    index.window = 0  # everything has expired
+    assert index.find_similar(3) is None
+    assert index.tree.root is None and index.expired == 0
+    index.close()
@@ -0,0 +1,104 @@
+import os
+import time
+import zipfile
+
+import pytest
+
+from firstimer import postprocess
+from firstimer.postprocess import PostProcessor
+
+POSTED_AT = time.mktime((2024, 5, 17, 12, 0, 0, 0, 0, -1))
+
+
+@pytest.fixture
+def processor(tmp_path):
+    created = []
+
+    def create(policy, **options):
+        messages = []
+        instance = PostProcessor(policy, str(tmp_path / "archive"), str(tmp_path / "state.db"), messages.append,
+                                 **options)
+        instance.messages = messages
+        created.append(instance)
+        return instance
+
+    yield create
+    for instance in created:
+        instance.close()
+
+
+@pytest.fixture
+def screenshot(tmp_path):
+    def make(name, size=10):
+        path = tmp_path / name
+        path.write_bytes(b"x" * size)
+        return str(path)
+    return make
+
+
+def posted_rows(instance):
+    with instance.lock:
+        return instance.db.execute("SELECT original_path, platforms, disposition, location FROM posted").fetchall()
+
+
+def test_archive_moves_into_a_dated_folder_without_overwriting(processor, screenshot, tmp_path):
+    instance = processor("archive")
+    first = instance.archive(screenshot("a.png"), POSTED_AT)
+    second = instance.archive(screenshot("a.png"), POSTED_AT)
+    folder = tmp_path / "archive" / "2024" / "2024-05-17"
+    assert (first, second) == (str(folder / "a.png"), str(folder / "a-1.png"))
+    assert not os.path.exists(tmp_path / "a.png")
+
+
+def test_zip_appends_and_starts_a_new_part_at_the_size_limit(processor, screenshot, tmp_path):
+    instance = processor("zip", zip_max_bytes=1000)
+    first = instance.add_to_zip(screenshot("a.png", 1200), "aaaaaaaaaaaaaaaa", POSTED_AT)
+    second = instance.add_to_zip(screenshot("b.png", 1200), "bbbbbbbbbbbbbbbb", POSTED_AT)
+    assert first == f"{tmp_path / 'archive' / 'screenshots-2024-05.zip'}:2024-05-17/aaaaaaaaaaaa-a.png"
+    assert second.startswith(f"{tmp_path / 'archive' / 'screenshots-2024-05-2.zip'}:")
+    with zipfile.ZipFile(tmp_path / "archive" / "screenshots-2024-05.zip") as archive:
+        assert archive.namelist() == ["2024-05-17/aaaaaaaaaaaa-a.png"]
+    assert not os.path.exists(tmp_path / "a.png") and not os.path.exists(tmp_path / "b.png")
+
+
+def test_trash_goes_through_the_recycle_bin(processor, screenshot, monkeypatch):
+    trashed = []
+    monkeypatch.setattr(postprocess, "trash_screenshot", trashed.append)
+    instance = processor("trash")
+    path = screenshot("a.png")
+    instance.submit(path, "hash", ["facebook", "instagram"]).result(timeout=5)
+    assert trashed == [path]
+    assert posted_rows(instance) == [(path, "facebook,instagram", "trash", None)]
+
+
+def test_keep_leaves_the_file_and_records_it(processor, screenshot):
+    instance = processor("keep")
+    path = screenshot("a.png")
+    instance.submit(path, "hash", ["facebook"]).result(timeout=5)
+    assert os.path.exists(path)
+    assert posted_rows(instance) == [(path, "facebook", "keep", None)]
+    assert instance.messages == []
+
+
+def test_a_failure_is_logged_and_recorded_not_raised(processor, tmp_path):
+    instance = processor("archive")
+    path = str(tmp_path / "gone.png")
+    instance.submit(path, "hash", ["facebook"]).result(timeout=5)
+    [(original, _, disposition, error)] = posted_rows(instance)
+    assert (original, disposition) == (path, "error")
+    assert error
+    assert any("Could not archive" in message for message in instance.messages)
+
+
+def test_close_waits_for_queued_work(tmp_path, screenshot):
+    instance = PostProcessor("archive", str(tmp_path / "archive"), str(tmp_path / "state.db"), lambda message: None)
+    paths = [screenshot(f"{n}.png") for n in range(5)]
+    for path in paths:
+        instance.submit(path, "hash", ["facebook"])
+    instance.close()
+    assert not any(os.path.exists(path) for path in paths)
+
+
+def test_unknown_policy_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        PostProcessor("shred", str(tmp_path), str(tmp_path / "state.db"), lambda message: None)
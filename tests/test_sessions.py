@@ -0,0 +1,69 @@
+import os
+import threading
+
+import pytest
+
+from firstimer.sessions import SessionPool, session_platforms, session_user_data_dir
+
+
+class StubSession:
+    def __init__(self, index):
+        self.index = index
+        self.name = f"stub session {index}"
+
+    def start(self):
+        pass
+
+    def is_healthy(self):
+        return True
+
+
+class StubSessionPool(SessionPool):
+    def __init__(self, size):
+        self.log_callback = lambda message: None
+        self.sessions = [StubSession(index) for index in range(size)]
+        self.assign_platforms()
+
+
+@pytest.mark.parametrize("size, expected", [
+    (1, [("facebook", "instagram")]),
+    (2, [("facebook",), ("instagram",)]),
+    (4, [("facebook",), ("instagram",), ("facebook",), ("instagram",)]),
+])
+def test_each_platform_gets_its_own_sessions(size, expected):
+    assert [session_platforms(index, size) for index in range(size)] == expected
+
+
+def test_extra_sessions_get_their_own_profiles():
+    assert session_user_data_dir("profiles/main", 0) == "profiles/main"
+    assert session_user_data_dir("profiles/main", 2) == "profiles/main-session2"
+    assert session_user_data_dir("", 0) == ""
+    assert session_user_data_dir("", 1) == os.path.abspath("chrome-session1")
+
+
+def test_platforms_lease_their_own_sessions_side_by_side():
+    pool = StubSessionPool(2)
+    pool.start()
+    assert (pool.sessions_for("facebook"), pool.sessions_for("instagram")) == (1, 1)
+    with pool.lease("facebook") as facebook, pool.lease("instagram", timeout=1) as instagram:
+        assert (facebook.index, instagram.index) == (0, 1)
+    with pool.lease("facebook", timeout=1) as facebook:
+        assert facebook.index == 0
+
+
+def test_one_session_is_shared_one_post_at_a_time():
+    pool = StubSessionPool(1)
+    pool.start()
+    assert (pool.sessions_for("facebook"), pool.sessions_for("instagram")) == (1, 1)
+    leased = threading.Event()
+
+    def post_to_instagram():
+        with pool.lease("instagram"):
+            leased.set()
+
+    with pool.lease("facebook"):
+        waiter = threading.Thread(target=post_to_instagram)
+        waiter.start()
+        assert not leased.wait(0.1)
+    waiter.join(timeout=1)
+    assert leased.is_set()
@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+from firstimer.stabilizer import FileStabilizer
+
+
+@pytest.fixture
+def stabilized(tmp_path):
+    stop_event = threading.Event()
+    started = []
+
+    def start(on_stable=None, **options):
+        ready = []
+        messages = []
+        options = {"debounce": 0.05, "poll_interval": 0.02, "timeout": 5, **options}
+        stabilizer = FileStabilizer(on_stable or ready.append, stop_event, messages.append, **options)
+        stabilizer.start()
+        started.append(stabilizer)
+        return stabilizer, ready, messages
+
+    yield start
+    stop_event.set()
+    for stabilizer in started:
+        stabilizer.join(timeout=2)
+
+
+def wait_for(condition, timeout=3):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_a_finished_file_is_handed_on_once(stabilized, tmp_path):
+    stabilizer, ready, _ = stabilized()
+    path = tmp_path / "a.png"
+    path.write_bytes(b"png")
+    assert stabilizer.touch(str(path))
+    assert not stabilizer.touch(str(path))  # a second event for the same path
+    assert wait_for(lambda: ready == [str(path)])
+    time.sleep(0.2)
+    assert ready == [str(path)]
+
+
+def test_a_growing_file_waits_until_it_stops_changing(stabilized, tmp_path):
+    stabilizer, ready, _ = stabilized(debounce=0, poll_interval=0.05)
+    path = tmp_path / "a.png"
+    path.write_bytes(b"p")
+    stabilizer.touch(str(path))
+    for _ in range(30):
+        time.sleep(0.01)
+        with open(path, "ab") as f:
+            f.write(b"x")
+        assert ready == []
+    assert wait_for(lambda: ready == [str(path)])
+
+
+def test_empty_files_are_not_handed_on(stabilized, tmp_path):
+    stabilizer, ready, _ = stabilized()
+    path = tmp_path / "a.png"
+    path.write_bytes(b"")
+    stabilizer.touch(str(path))
+    time.sleep(0.3)
+    assert ready == []
+    path.write_bytes(b"png")
+    assert wait_for(lambda: ready == [str(path)])
+
+
+def test_deleted_and_renamed_files_are_dropped(stabilized, tmp_path):
+    stabilizer, ready, _ = stabilized()
+    stabilizer.touch(str(tmp_path / "never-written.png"))
+    path = tmp_path / "a.png.tmp"
+    path.write_bytes(b"png")
+    stabilizer.touch(str(path))
+    assert stabilizer.forget(str(path))
+    assert wait_for(lambda: not stabilizer.pending)
+    assert ready == []
+
+
+def test_a_file_that_never_settles_is_skipped(stabilized, tmp_path):
+    stabilizer, ready, messages = stabilized(timeout=0.2)
+    path = tmp_path / "a.png"
+    path.write_bytes(b"")  # stays empty, as if the capture tool hung
+    stabilizer.touch(str(path))
+    assert wait_for(lambda: not stabilizer.pending)
+    assert ready == []
+    assert any("never finished writing" in message for message in messages)
+
+
+def test_time_blocked_handing_on_a_file_does_not_count_against_others(stabilized, tmp_path):
+    # on_stable blocks while the upload queue is full; captures that arrive
+    # meanwhile must still be picked up once it returns.
+    ready = []
+
+    def on_stable(path):
+        if not ready:
+            time.sleep(1.5)
+        ready.append(path)
+
+    stabilizer, _, messages = stabilized(on_stable, timeout=1)
+    first = tmp_path / "a.png"
+    first.write_bytes(b"a")
+    stabilizer.touch(str(first))
+    assert wait_for(lambda: not stabilizer.pending)
+    second = tmp_path / "b.png"
+    second.write_bytes(b"b")
+    stabilizer.touch(str(second))
+    assert wait_for(lambda: len(ready) == 2)
+    assert ready == [str(first), str(second)]
+    assert messages == []
@@ -0,0 +1,142 @@
+import time
+
+import pytest
+
+from firstimer.upload_queue import UploadQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    upload_queue = UploadQueue(str(tmp_path / "upload_queue.db"), max_pending=10, max_attempts=3,
+                               retry_base_delay=10, retry_max_delay=25, max_replays=2)
+    yield upload_queue
+    upload_queue.close()
+
+
+@pytest.fixture
+def screenshot(tmp_path):
+    def make(name, content=b"png"):
+        path = tmp_path / name
+        path.write_bytes(content)
+        return str(path)
+    return make
+
+
+def test_put_fans_out_one_job_per_platform(queue, screenshot):
+    path = screenshot("a.png")
+    assert queue.put(path) == "queued"
+    assert queue.status(queue.claim_batch("facebook", timeout=0)[0].content_hash) == {
+        "facebook": "in_progress", "instagram": "pending"}
+
+
+def test_same_path_is_a_duplicate_while_waiting(queue, screenshot):
+    path = screenshot("a.png")
+    assert queue.put(path) == "queued"
+    assert queue.put(path) == "duplicate"
+    assert queue.active_count() == 1
+
+
+def test_same_content_under_another_name_is_a_duplicate(queue, screenshot):
+    assert queue.put(screenshot("a.png", b"same")) == "queued"
+    assert queue.put(screenshot("b.png", b"same")) == "duplicate"
+
+
+def test_posted_content_stays_a_duplicate(queue, screenshot):
+    path = screenshot("a.png")
+    queue.put(path, platforms=("facebook",))
+    job = queue.claim_batch("facebook", timeout=0)[0]
+    assert queue.complete(job)
+    assert queue.put(screenshot("copy.png", b"png"), platforms=("facebook",)) == "duplicate"
+    assert queue.is_settled(job.content_hash, ("facebook",))
+
+
+def test_failures_back_off_exponentially_up_to_the_cap(queue, screenshot):
+    queue.put(screenshot("a.png"), platforms=("facebook",))
+    job = queue.claim_batch("facebook", timeout=0)[0]
+    assert queue.fail(job, "boom") == 10
+    job = job._replace(attempts=1)
+    assert queue.fail(job, "boom") == 20
+    assert queue.claim_batch("facebook", timeout=0) == []  # still backing off
+
+
+def test_gives_up_after_max_attempts(queue, screenshot):
+    queue.put(screenshot("a.png"), platforms=("facebook",))
+    job = queue.claim_batch("facebook", timeout=0)[0]._replace(attempts=2)
+    assert queue.fail(job, "boom") is None
+    assert queue.status(job.content_hash) == {"facebook": "failed"}
+    assert queue.active_count() == 0
+
+
+def test_fail_without_retry_gives_up_at_once(queue, screenshot):
+    queue.put(screenshot("a.png"), platforms=("facebook",))
+    job = queue.claim_batch("facebook", timeout=0)[0]
+    assert queue.fail(job, "gone", retry=False) is None
+    assert queue.status(job.content_hash) == {"facebook": "failed"}
+
+
+def test_in_progress_jobs_run_again_after_a_restart(tmp_path, screenshot):
+    db_file = str(tmp_path / "upload_queue.db")
+    queue = UploadQueue(db_file)
+    queue.put(screenshot("a.png"), platforms=("facebook",))
+    job = queue.claim_batch("facebook", timeout=0)[0]
+    queue.close()
+
+    queue = UploadQueue(db_file)
+    try:
+        reclaimed = queue.claim_batch("facebook", timeout=0)
+        assert [j.id for j in reclaimed] == [job.id]
+        assert reclaimed[0].attempts == 0
+    finally:
+        queue.close()
+
+
+def test_release_replays_without_spending_an_attempt(queue, screenshot):
+    queue.put(screenshot("a.png"), platforms=("facebook",))
+    job = queue.claim_batch("facebook", timeout=0)[0]
+    assert queue.release(job, "browser went away", base_delay=0) == 0
+    job = queue.claim_batch("facebook", timeout=0)[0]
+    assert (job.attempts, job.replays) == (0, 1)
+    assert queue.release(job, "browser went away", base_delay=4) == 8
+
+
+def test_a_real_failure_resets_the_replay_count(queue, screenshot):
+    queue.put(screenshot("a.png"), platforms=("facebook",))
+    job = queue.claim_batch("facebook", timeout=0)[0]
+    queue.release(job, "browser went away", base_delay=0)
+    job = queue.claim_batch("facebook", timeout=0)[0]
+    queue.fail(job, "boom")
+    assert queue.db.execute("SELECT attempts, replays FROM jobs").fetchone() == (1, 0)
+
+
+def test_claim_batch_takes_up_to_max_items_oldest_first(queue, screenshot):
+    paths = [screenshot(f"{i}.png", bytes([i])) for i in range(3)]
+    for path in paths:
+        queue.put(path, platforms=("facebook",))
+    batch = queue.claim_batch("facebook", timeout=0, max_items=2)
+    assert [job.path for job in batch] == paths[:2]
+    assert [job.path for job in queue.claim_batch("facebook", timeout=0, max_items=2)] == paths[2:]
+
+
+def test_claim_batch_window_waits_for_more_captures(queue, screenshot):
+    queue.put(screenshot("a.png", b"a"), platforms=("facebook",))
+    assert queue.claim_batch("facebook", timeout=0.05, max_items=2, window=0.5) == []
+    queue.put(screenshot("b.png", b"b"), platforms=("facebook",))
+    started = time.monotonic()
+    batch = queue.claim_batch("facebook", timeout=2, max_items=2, window=0.5)
+    assert len(batch) == 2
+    assert time.monotonic() - started < 0.5  # a full batch doesn't wait out the window
+
+
+def test_claim_batch_window_sends_a_partial_batch_once_it_expires(queue, screenshot):
+    queue.put(screenshot("a.png"), platforms=("facebook",))
+    batch = queue.claim_batch("facebook", timeout=2, max_items=5, window=0.2)
+    assert len(batch) == 1
+
+
+def test_settled_hashes_matches_is_settled(queue, screenshot):
+    queue.put(screenshot("a.png", b"a"))
+    queue.put(screenshot("b.png", b"b"), platforms=("facebook",))
+    hashes = {row[0] for row in queue.db.execute("SELECT content_hash FROM jobs")}
+    expected = {content_hash for content_hash in hashes if queue.is_settled(content_hash)}
+    assert queue.settled_hashes(hashes, chunk_size=1) == expected
+    assert len(expected) == 1